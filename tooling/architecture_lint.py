@@ -2,6 +2,8 @@
 import sys
 from pathlib import Path
 
+from repo_scan import RepoScan
+
 ROOT = Path(__file__).resolve().parents[1]
 
 # Minimal structural guardrails for starter implementation harness.
@@ -18,6 +20,8 @@ FORBIDDEN_TOP_LEVEL = {
     "notes",
 }
 
+MAX_TOOLING_LINES = 500
+
 
 def fail(msg: str) -> None:
     print(f"FAIL: {msg}")
@@ -27,10 +31,10 @@ def ok(msg: str) -> None:
     print(f"OK: {msg}")
 
 
-def main() -> int:
+def check(scan: RepoScan) -> list[str]:
     errors = []
 
-    top_level = {p.name for p in ROOT.iterdir() if p.is_dir()}
+    top_level = scan.top_level_dirs()
     missing = sorted(REQUIRED_TOP_LEVEL - top_level)
     for name in missing:
         errors.append(f"missing required top-level directory: {name}")
@@ -40,10 +44,19 @@ def main() -> int:
         errors.append(f"forbidden top-level directory present: {name}")
 
     # Keep tooling scripts reasonably small and legible for agents.
-    for p in (ROOT / "tooling").glob("*.py"):
-        line_count = len(p.read_text(encoding="utf-8").splitlines())
-        if line_count > 500:
-            errors.append(f"tooling script too large (>500 lines): {p.relative_to(ROOT)} ({line_count})")
+    for rel in scan.glob("tooling/*.py"):
+        if "/" in rel[len("tooling/"):]:
+            continue
+        line_count = scan.fact(rel, "lines", lambda text: len(text.splitlines()))
+        if line_count > MAX_TOOLING_LINES:
+            errors.append(f"tooling script too large (>{MAX_TOOLING_LINES} lines): {rel} ({line_count})")
+    return errors
+
+
+def main() -> int:
+    scan = RepoScan()
+    errors = check(scan)
+    scan.save()
 
     if errors:
         for e in errors:
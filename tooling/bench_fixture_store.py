@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""Memory and throughput benchmark of the fixture todo store.
+
+Compares the columnar TodoStore with a dict-per-todo store laid out like its predecessor (string
+ids, one dict per todo keyed by int id, (dueDate, id) tuples for the date index), both behind the
+same lock and index scheme. Stores are filled through `restore()` from persisted NDJSON lines,
+the fixture's bulk path; memory is the traced allocation growth while restoring.
+"""
+import argparse
+import bisect
+import json
+import random
+import threading
+import time
+import tracemalloc
+from typing import Dict, List, Optional, Tuple
+
+from fixture_store import ListQuery, TodoStore, json_array
+
+PAGE = 100
+
+
+class DictStore:
+    """Baseline: every todo is a dict, serialized on each read."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self._items: Dict[int, dict] = {}
+        self._ids: List[int] = []
+        self._by_completed: Dict[bool, List[int]] = {False: [], True: []}
+        self._by_due: List[Tuple[str, int]] = []
+
+    def restore(self, todos) -> int:
+        with self.lock:
+            for todo, _ in todos:
+                todo_id = int(todo["id"])
+                self._items[todo_id] = todo
+                self._ids.append(todo_id)
+                self._by_completed[bool(todo["completed"])].append(todo_id)
+                if isinstance(todo.get("dueDate"), str):
+                    self._by_due.append((todo["dueDate"], todo_id))
+            self._by_due.sort()
+            return len(self._ids)
+
+    def create(self, title: str, due_date: Optional[str] = None) -> bytes:
+        with self.lock:
+            todo_id = len(self._ids) + 1
+            todo = {"id": str(todo_id), "title": title, "completed": False}
+            if due_date is not None:
+                todo["dueDate"] = due_date
+                bisect.insort(self._by_due, (due_date, todo_id))
+            self._items[todo_id] = todo
+            self._ids.append(todo_id)
+            self._by_completed[False].append(todo_id)
+        return json.dumps(todo).encode("utf-8")
+
+    def get_json(self, todo_id: str) -> Optional[bytes]:
+        with self.lock:
+            todo = self._items.get(int(todo_id))
+        return json.dumps(todo).encode("utf-8") if todo is not None else None
+
+    def page(self, query: ListQuery) -> bytes:
+        with self.lock:
+            if query.has_due_range:
+                lo = bisect.bisect_left(self._by_due, (query.due_from,))
+                hi = bisect.bisect_right(self._by_due, (query.due_to, float("inf")))
+                candidates = sorted(todo_id for _, todo_id in self._by_due[lo:hi])
+            else:
+                candidates = self._by_completed[query.completed] if query.completed is not None else self._ids
+            start = bisect.bisect_right(candidates, query.cursor or 0)
+            todos = [self._items[todo_id] for todo_id in candidates[start:start + query.limit]]
+        return json.dumps(todos).encode("utf-8")
+
+
+def compact_page(store: TodoStore, query: ListQuery) -> bytes:
+    return json_array(store.list(query)[0])
+
+
+def records(n: int) -> List[bytes]:
+    """Persisted todo lines; half the todos have a due date."""
+    rng = random.Random(n)
+    lines = []
+    for i in range(1, n + 1):
+        todo = {"id": str(i), "title": f"todo number {i}", "completed": i % 5 == 0}
+        if i % 2:
+            todo["dueDate"] = f"2026-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+        lines.append(json.dumps(todo).encode("utf-8") + b"\n")
+    return lines
+
+
+def load(store, lines: List[bytes]) -> float:
+    started = time.perf_counter()
+    # Parsed and sliced lazily, like Journal.load(), so every object is allocated while loading.
+    store.restore((json.loads(line), line[:-1]) for line in lines)
+    return time.perf_counter() - started
+
+
+def traced_bytes(make_store, lines: List[bytes]) -> int:
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    store = make_store()
+    load(store, lines)
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del store
+    return used
+
+
+def rate(fn, ops: int) -> float:
+    """Best-of-3 operations per second."""
+    best = float("inf")
+    for _ in range(3):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return ops / best
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark fixture todo store memory and throughput.")
+    parser.add_argument("--items", type=int, nargs="+", default=[100_000, 1_000_000], help="store sizes to load")
+    parser.add_argument("--creates", type=int, default=20_000, help="POST /todos inserts per measurement")
+    parser.add_argument("--lookups", type=int, default=100_000, help="GET /todos/{id} lookups per measurement")
+    parser.add_argument("--pages", type=int, default=2_000, help="list pages per measurement")
+    args = parser.parse_args()
+
+    stores = {"dict": DictStore, "compact": TodoStore}
+    pages = {"dict": DictStore.page, "compact": compact_page}
+    print(
+        f"{'items':>9} {'store':<8} {'bytes/item':>10} {'restores/s':>10} {'creates/s':>10} {'gets/s':>10} "
+        f"{'pages/s':>9} {'due pages/s':>11}"
+    )
+    for n in args.items:
+        lines = records(n)
+        rng = random.Random(0)
+        ids = [str(rng.randint(1, n)) for _ in range(args.lookups)]
+        cursors = [rng.randint(0, max(0, n - PAGE)) for _ in range(args.pages)]
+        for name, make_store in stores.items():
+            per_item = traced_bytes(make_store, lines) / n
+            store = make_store()
+            restores = n / load(store, lines)
+            page = pages[name]
+            gets = rate(lambda: [store.get_json(todo_id) for todo_id in ids], len(ids))
+            listed = rate(
+                lambda: [page(store, ListQuery(limit=PAGE, cursor=c, completed=False)) for c in cursors], len(cursors)
+            )
+            due = ListQuery(limit=PAGE, due_from="2026-06-01", due_to="2026-06-01")
+            due_listed = rate(lambda: [page(store, due) for _ in cursors], len(cursors))
+            # New todos carry no dueDate: both stores insert dated ones with an O(n) sorted-list insert.
+            started = time.perf_counter()
+            for i in range(args.creates):
+                store.create(f"new todo {i}")
+            creates = args.creates / (time.perf_counter() - started)
+            print(
+                f"{n:>9} {name:<8} {per_item:>10.0f} {restores:>10.0f} {creates:>10.0f} {gets:>10.0f} "
+                f"{listed:>9.0f} {due_listed:>11.0f}"
+            )
+            del store
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
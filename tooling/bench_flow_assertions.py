@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""Micro-benchmark of per-response `expect_body` assertion cost.
+
+Compares the compiled AssertionPlan each Step carries (the evaluator's hot path) with the
+interpreter it replaced, which walked the `expect_body` dict on every response, for a single todo
+and for todo lists. Bodies are decoded from JSON built with a fixed seed, like real responses.
+Each repetition times both sides back to back; the table shows the median of the repetitions and
+the lowest per-repetition speedup.
+"""
+import argparse
+import json
+import random
+import statistics
+import timeit
+
+from flow_assertions import AssertionPlan
+
+TODO_EXPECT = {
+    "has_fields": ["id", "title", "completed"],
+    "equals": {"title": "Buy milk", "completed": False},
+    "contains": {"title": "milk"},
+}
+LIST_EXPECT = {
+    "length_gte": 1,
+    "all_have_fields": ["id", "title", "completed"],
+    "all_equal": {"completed": False},
+}
+
+
+def interpreted(flow_name: str, step_index: int, expect: dict, resp_body, context: dict):
+    """Baseline: the per-response evaluation loop used before plans were compiled."""
+    prefix = f"{flow_name}:step#{step_index}"
+    if not expect:
+        return
+
+    if "has_fields" in expect:
+        if not isinstance(resp_body, dict):
+            raise AssertionError(f"{prefix} expected JSON object body for has_fields")
+        for field in expect["has_fields"]:
+            if field not in resp_body:
+                raise AssertionError(f"{prefix} missing expected field '{field}'")
+
+    if "equals" in expect:
+        if not isinstance(resp_body, dict):
+            raise AssertionError(f"{prefix} expected JSON object body for equals")
+        for k, v in expect["equals"].items():
+            if resp_body.get(k) != v:
+                raise AssertionError(f"{prefix} expected body[{k!r}] == {v!r}, got {resp_body.get(k)!r}")
+
+    if "contains" in expect:
+        contains = expect["contains"]
+        if isinstance(resp_body, dict):
+            for k, v in contains.items():
+                actual = resp_body.get(k)
+                if v not in str(actual):
+                    raise AssertionError(f"{prefix} expected body[{k!r}] to contain {v!r}, got {actual!r}")
+        else:
+            raw = str(resp_body)
+            for _, v in contains.items():
+                if v not in raw:
+                    raise AssertionError(f"{prefix} expected response body to contain {v!r}")
+
+    for key, op, ok in (
+        ("length_equals", "", int.__eq__),
+        ("length_gte", ">= ", int.__ge__),
+        ("length_lte", "<= ", int.__le__),
+    ):
+        if key in expect:
+            if not isinstance(resp_body, list):
+                raise AssertionError(f"{prefix} expected JSON array body for {key}")
+            if not ok(len(resp_body), int(expect[key])):
+                raise AssertionError(f"{prefix} expected array length {op}{expect[key]}, got {len(resp_body)}")
+
+    if "all_have_fields" in expect:
+        if not isinstance(resp_body, list):
+            raise AssertionError(f"{prefix} expected JSON array body for all_have_fields")
+        fields = expect["all_have_fields"]
+        for idx, item in enumerate(resp_body):
+            if not isinstance(item, dict):
+                raise AssertionError(f"{prefix} expected object at index {idx} in array")
+            for field in fields:
+                if field not in item:
+                    raise AssertionError(f"{prefix} item {idx} missing field '{field}'")
+
+    if "all_equal" in expect:
+        if not isinstance(resp_body, list):
+            raise AssertionError(f"{prefix} expected JSON array body for all_equal")
+        for idx, item in enumerate(resp_body):
+            for k, v in expect["all_equal"].items():
+                if not isinstance(item, dict) or item.get(k) != v:
+                    actual = item.get(k) if isinstance(item, dict) else item
+                    raise AssertionError(f"{prefix} expected item {idx}[{k!r}] == {v!r}, got {actual!r}")
+
+    if isinstance(resp_body, dict) and "id" in resp_body:
+        context["id"] = resp_body["id"]
+
+
+def todos(rng: random.Random, n: int) -> list:
+    """`n` open todos as a runtime would return them, decoded from JSON."""
+    items = []
+    for i in range(1, n + 1):
+        todo = {"id": str(i), "title": f"Buy milk {rng.randint(1, 10_000)}", "completed": False}
+        if rng.random() < 0.5:
+            todo["dueDate"] = f"2026-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+        items.append(todo)
+    return json.loads(json.dumps(items))
+
+
+def paired(compiled, baseline, repeat: int):
+    """Median microseconds per call of each function, and the lowest speedup of any repetition."""
+    timers = timeit.Timer(compiled), timeit.Timer(baseline)
+    # autorange() sizes a run to at least 0.2 s; a tenth of that keeps many repetitions affordable.
+    number = max(1, max(timer.autorange()[0] for timer in timers) // 10)
+    runs = [[timer.timeit(number) / number * 1e6 for timer in timers] for _ in range(repeat)]
+    fast = statistics.median(run[0] for run in runs)
+    slow = statistics.median(run[1] for run in runs)
+    return fast, slow, min(run[1] / run[0] for run in runs)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark flow expect_body assertions per response.")
+    parser.add_argument("--items", type=int, nargs="+", default=[10, 100, 1000], help="list sizes to check")
+    parser.add_argument("--repeat", type=int, default=21, help="timed repetitions per case")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the generated response bodies")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    single = todos(rng, 1)[0]
+    single["title"] = "Buy milk"
+    cases = [("todo object", TODO_EXPECT, single)]
+    cases += [(f"list of {n}", LIST_EXPECT, todos(rng, n)) for n in args.items]
+
+    print(f"{'case':<16} {'compiled us':>12} {'interpreted us':>15} {'speedup':>8} {'worst':>6}")
+    for label, expect, body in cases:
+        context: dict = {}
+        plan = AssertionPlan("bench", 1, expect)
+        compiled, baseline, worst = paired(
+            lambda: plan.check(body, context), lambda: interpreted("bench", 1, expect, body, context), args.repeat
+        )
+        print(f"{label:<16} {compiled:>12.2f} {baseline:>15.2f} {baseline / compiled:>7.1f}x {worst:>5.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""Contract coverage index for flow_contract_eval: which flow steps exercise each declared response.
+
+Per-step check results are persisted in `.cache/contract/`, keyed by the flow file's mtime and size
+and by a digest of every operation the flow touches. A run only re-checks flows whose file or
+referenced operations changed; coverage is then assembled from the index. The whole index is
+dropped when the checking code (`CHECK_FILES`) changes.
+"""
+import hashlib
+import json
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from spec_loader import ROOT, ApiSpec, Flow, Step, code_digest
+
+CACHE_DIR = ROOT / ".cache/contract"
+# Bump when the cached entry layout changes.
+CACHE_FORMAT = 1
+# Code behind the cached verdicts: check_step, this index, ACTION_MAP and the step compiler.
+_TOOLING = Path(__file__).resolve().parent
+CHECK_FILES = tuple(
+    _TOOLING / name for name in ("flow_contract_eval.py", "contract_coverage.py", "spec_loader.py", "flow_policy.py")
+)
+# Status recorded for steps without `expect_status`: they touch the operation but cover no response.
+ANY_STATUS = "*"
+
+# (method, path, status)
+Response = Tuple[str, str, str]
+
+
+def operation_digests(api: ApiSpec) -> Dict[str, str]:
+    return {
+        f"{method} {path}": hashlib.sha256(json.dumps(op.raw, sort_keys=True, default=str).encode()).hexdigest()
+        for (method, path), op in api.operations.items()
+    }
+
+
+class CoverageIndex:
+    def __init__(self, version: str, api: ApiSpec, cache_dir: Optional[Path] = CACHE_DIR):
+        self.version = version
+        self.api = api
+        self.digests = operation_digests(api)
+        self.code = code_digest(CHECK_FILES)
+        self.cache_file = cache_dir / f"coverage-v{version}.json" if cache_dir is not None else None
+        self._cached = self._load()
+        # flow file -> cache entry, for every flow seen in this run
+        self.entries: Dict[str, dict] = {}
+        self.rechecked = 0
+
+    def _load(self) -> Dict[str, dict]:
+        if self.cache_file is None:
+            return {}
+        try:
+            data = json.loads(self.cache_file.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        if data.get("format") != CACHE_FORMAT or data.get("code") != self.code:
+            return {}
+        return data.get("flows", {})
+
+    def save(self) -> None:
+        if self.cache_file is None:
+            return
+        try:
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.cache_file.with_suffix(".tmp")
+            data = {"format": CACHE_FORMAT, "code": self.code, "flows": self.entries}
+            tmp.write_text(json.dumps(data, sort_keys=True), encoding="utf-8")
+            tmp.replace(self.cache_file)
+        except OSError:
+            pass
+
+    def check_flow(self, flow: Flow, check_step: Callable[[Step, List[str]], None]) -> List[List[str]]:
+        """Errors per step of `flow`, re-running `check_step` only when the flow or its operations changed."""
+        st = flow.path.stat()
+        ops = {f"{s.method} {s.path}": None for s in flow.steps if s.method is not None}
+        ops = {op: self.digests.get(op) for op in sorted(ops)}
+        entry = self._cached.get(flow.file)
+        if entry is None or entry["stat"] != [st.st_mtime_ns, st.st_size] or entry["ops"] != ops:
+            self.rechecked += 1
+            steps = []
+            for step in flow.steps:
+                errors: List[str] = []
+                check_step(step, errors)
+                status = str(step.expect_status) if step.expect_status is not None else ANY_STATUS
+                covers = [step.method, step.path, status] if step.method is not None else None
+                steps.append({"index": step.index, "covers": covers, "errors": errors})
+            entry = {"stat": [st.st_mtime_ns, st.st_size], "ops": ops, "steps": steps}
+        self.entries[flow.file] = entry
+        return [step["errors"] for step in entry["steps"]]
+
+    def report(self) -> dict:
+        """Declared responses with the steps covering them, plus untested and undeclared responses."""
+        covering: Dict[Response, List[str]] = {}
+        for file, entry in sorted(self.entries.items()):
+            for step in entry["steps"]:
+                if step["covers"] is not None:
+                    covering.setdefault(tuple(step["covers"]), []).append(f"{file}:step#{step['index']}")
+        declared = sorted(
+            (method, path, code)
+            for (method, path), op in self.api.operations.items()
+            for code in op.responses
+            if code.isdigit()
+        )
+        declared_set = set(declared)
+        responses = [
+            {"method": m, "path": p, "status": s, "steps": covering.get((m, p, s), [])} for m, p, s in declared
+        ]
+        covered = sum(1 for r in responses if r["steps"])
+        untested = [{key: r[key] for key in ("method", "path", "status")} for r in responses if not r["steps"]]
+        return {
+            "version": self.version,
+            "declared": len(declared),
+            "covered": covered,
+            "coverage_pct": (covered / len(declared)) * 100 if declared else 100.0,
+            "responses": responses,
+            "untested": untested,
+            "undeclared": [
+                {"method": m, "path": p, "status": s, "steps": steps}
+                for (m, p, s), steps in sorted(covering.items())
+                if s != ANY_STATUS and (m, p, s) not in declared_set
+            ],
+            "flows_rechecked": self.rechecked,
+            "flows_total": len(self.entries),
+        }
+
+
+def format_coverage(report: dict) -> List[str]:
+    lines = [
+        f"COVERAGE v{report['version']}: {report['covered']} of {report['declared']} declared responses covered "
+        f"({report['coverage_pct']:.1f}%); re-checked {report['flows_rechecked']} of {report['flows_total']} flow files"
+    ]
+    for r in report["untested"]:
+        lines.append(f"  UNTESTED {r['method']} {r['path']} {r['status']}")
+    for r in report["undeclared"]:
+        lines.append(f"  UNDECLARED {r['method']} {r['path']} {r['status']} ({', '.join(r['steps'])})")
+    return lines
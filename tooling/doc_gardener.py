@@ -1,7 +1,13 @@
 #!/usr/bin/env python3
 import argparse
+import hashlib
+import os
 import re
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import List, Optional, Tuple
+
+from repo_scan import RepoScan
 
 ROOT = Path(__file__).resolve().parents[1]
 
@@ -14,43 +20,77 @@ REPLACEMENTS = [
 
 SKIP_PREFIXES = [".git/", "spec/starter-spec-v"]
 
+# Every replacement and trailing whitespace are rewritten in one pass; longer literals win ties.
+_REPLACE = dict(REPLACEMENTS)
+_PATTERN = re.compile(
+    "|".join([r"[ \t]+$"] + [re.escape(old) for old in sorted(_REPLACE, key=len, reverse=True)]), re.MULTILINE
+)
+# Cached "already normalized" results are only valid for this exact rule set.
+CLEAN_FACT = "doc-gardener-clean:" + hashlib.sha256(f"{REPLACEMENTS!r}{_PATTERN.pattern}".encode()).hexdigest()[:16]
+
 
-def iter_markdown_files():
-    for p in ROOT.rglob("*.md"):
-        rel = p.relative_to(ROOT).as_posix()
+def iter_markdown_files(scan: RepoScan):
+    for rel in scan.glob("*.md"):
         if any(rel.startswith(prefix) for prefix in SKIP_PREFIXES):
             continue
-        yield p
+        yield rel
+
+
+def _substitute(match: re.Match) -> str:
+    return _REPLACE.get(match.group(0), "")
+
+
+def needs_normalizing(text: str) -> bool:
+    # Plain substring searches are far cheaper than any regex scan, and most files are already clean.
+    return not text.endswith("\n") or " \n" in text or "\t\n" in text or any(old in text for old in _REPLACE)
 
 
 def normalize_text(text: str) -> str:
-    out = text
-    for old, new in REPLACEMENTS:
-        out = out.replace(old, new)
-    out = re.sub(r"[ \t]+$", "", out, flags=re.MULTILINE)
+    if not needs_normalizing(text):
+        return text
+    out = _PATTERN.sub(_substitute, text)
     if not out.endswith("\n"):
         out += "\n"
     return out
 
 
+def _needs_fix(scan: RepoScan, rel: str) -> Optional[Tuple[str, str]]:
+    # Files unchanged since a run found them clean are skipped without being read.
+    if scan.fact(rel, CLEAN_FACT, lambda text: not needs_normalizing(text)):
+        return None
+    return rel, normalize_text(scan.read_text(rel))
+
+
+def find_changes(scan: RepoScan, jobs: int = 0) -> List[Tuple[str, str]]:
+    """(relative path, normalized text) for every markdown file that needs fixing, in path order."""
+    files = list(iter_markdown_files(scan))
+    with ThreadPoolExecutor(max_workers=jobs or min(8, os.cpu_count() or 1)) as pool:
+        return [change for change in pool.map(lambda rel: _needs_fix(scan, rel), files) if change is not None]
+
+
+def check(scan: RepoScan) -> List[str]:
+    return [f"doc drift in {rel} (run tooling/doc_gardener.py to fix)" for rel, _ in find_changes(scan)]
+
+
 def main() -> int:
     parser = argparse.ArgumentParser(description="Auto-fix low-risk documentation drift.")
     parser.add_argument("--check", action="store_true", help="Only check; exit non-zero if changes needed")
+    parser.add_argument("--jobs", type=int, default=0, help="Worker threads (default: min(8, CPU count))")
     args = parser.parse_args()
+    if args.jobs < 0:
+        parser.error("--jobs must be >= 0")
 
-    changed = []
-    for p in iter_markdown_files():
-        src = p.read_text(encoding="utf-8")
-        dst = normalize_text(src)
-        if dst != src:
-            changed.append(p)
-            if not args.check:
-                p.write_text(dst, encoding="utf-8")
+    scan = RepoScan()
+    changed = find_changes(scan, args.jobs)
+    if not args.check:
+        for rel, dst in changed:
+            (ROOT / rel).write_text(dst, encoding="utf-8")
+    scan.save()
 
     if changed:
         print("doc-gardener changes needed:")
-        for p in changed:
-            print(f"- {p.relative_to(ROOT)}")
+        for rel, _ in changed:
+            print(f"- {rel}")
         return 1 if args.check else 0
 
     print("doc-gardener: no changes needed")
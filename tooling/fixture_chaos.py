@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""Seeded fault injection for the fixture runtime: delays, 5xx errors, dropped connections and slow-drip bodies.
+
+The config file (YAML or JSON) maps routes to faults:
+
+    seed: 42
+    routes:
+      "GET /todos":                  # method + route template, a route for any method, or "*"
+        delay_ms: {lognormal: [40, 0.5]}
+        error_rate: 0.05
+        error_status: 503
+      "/todos/{id}":
+        drop_rate: 0.01
+      "*":
+        drip: {chunk_bytes: 64, interval_ms: 20}
+
+`delay_ms` is a number (fixed) or one of {uniform: [lo, hi]}, {normal: [mean, stddev]},
+{lognormal: [median, sigma]} and {exponential: mean}. `*` does not apply to /health and /metrics,
+so readiness probes and scrapes stay reliable unless a rule names them explicitly.
+
+Every route draws from its own RNG seeded with (seed, rule), so the n-th request to a route gets
+the same faults on every run regardless of how requests to other routes interleave.
+"""
+import json
+import math
+import random
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+# Routes a "*" rule leaves alone.
+INFRA_ROUTES = {"/health", "/metrics"}
+RULE_KEYS = {"delay_ms", "error_rate", "error_status", "drop_rate", "drip"}
+
+# Sampler(rng) -> milliseconds
+Sampler = Callable[[random.Random], float]
+
+
+@dataclass(frozen=True)
+class Drip:
+    chunk_bytes: int
+    interval_sec: float
+
+
+@dataclass(frozen=True)
+class Fault:
+    """Faults chosen for one request."""
+
+    delay_sec: float = 0.0
+    error_status: Optional[int] = None
+    drop: bool = False
+    drip: Optional[Drip] = None
+
+
+def _number(value, where: str, lo: float = 0.0, hi: float = math.inf) -> float:
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not lo <= value <= hi:
+        raise ValueError(f"{where} must be a number in [{lo:g}, {hi:g}], got {value!r}")
+    return float(value)
+
+
+def _pair(value, where: str):
+    if not isinstance(value, list) or len(value) != 2:
+        raise ValueError(f"{where} must be a [a, b] pair, got {value!r}")
+    return _number(value[0], where), _number(value[1], where)
+
+
+def delay_sampler(value, where: str) -> Sampler:
+    if not isinstance(value, dict):
+        ms = _number(value, where)
+        return lambda rng: ms
+    if len(value) != 1:
+        raise ValueError(f"{where} must name exactly one distribution, got {sorted(value)}")
+    (kind, params), = value.items()
+    where = f"{where}.{kind}"
+    if kind == "uniform":
+        lo, hi = _pair(params, where)
+        return lambda rng: rng.uniform(lo, hi)
+    if kind == "normal":
+        mean, stddev = _pair(params, where)
+        return lambda rng: max(0.0, rng.gauss(mean, stddev))
+    if kind == "lognormal":
+        median, sigma = _pair(params, where)
+        if median <= 0:
+            raise ValueError(f"{where} median must be > 0")
+        mu = math.log(median)
+        return lambda rng: rng.lognormvariate(mu, sigma)
+    if kind == "exponential":
+        mean = _number(params, where)
+        return (lambda rng: rng.expovariate(1.0 / mean)) if mean > 0 else (lambda rng: 0.0)
+    raise ValueError(f"{where}: unknown distribution; expected uniform, normal, lognormal or exponential")
+
+
+class RouteChaos:
+    """One rule of the config with its own seeded RNG."""
+
+    def __init__(self, key: str, rule: dict, seed):
+        if not isinstance(rule, dict):
+            raise ValueError(f"chaos rule {key!r} must be a mapping")
+        unknown = sorted(set(rule) - RULE_KEYS)
+        if unknown:
+            raise ValueError(f"chaos rule {key!r} has unknown keys {unknown}")
+        self.key = key
+        self.delay = delay_sampler(rule["delay_ms"], f"{key}.delay_ms") if "delay_ms" in rule else None
+        self.error_rate = _number(rule.get("error_rate", 0), f"{key}.error_rate", 0, 1)
+        self.error_status = int(_number(rule.get("error_status", 503), f"{key}.error_status", 500, 599))
+        self.drop_rate = _number(rule.get("drop_rate", 0), f"{key}.drop_rate", 0, 1)
+        self.drip = None
+        if "drip" in rule:
+            drip = rule["drip"] if isinstance(rule["drip"], dict) else {}
+            self.drip = Drip(
+                int(_number(drip.get("chunk_bytes"), f"{key}.drip.chunk_bytes", 1)),
+                _number(drip.get("interval_ms"), f"{key}.drip.interval_ms") / 1000.0,
+            )
+        self._rng = random.Random(f"{seed}:{key}")
+        self._lock = threading.Lock()
+
+    def decide(self) -> Fault:
+        # Every request consumes the same draws, so one fault's rate never shifts another's sequence.
+        with self._lock:
+            drop = self._rng.random() < self.drop_rate
+            error = self._rng.random() < self.error_rate
+            delay_ms = self.delay(self._rng) if self.delay is not None else 0.0
+        return Fault(delay_ms / 1000.0, self.error_status if error else None, drop, self.drip)
+
+
+def _read_config(path: Path):
+    """JSON configs parse with the standard library; PyYAML is only imported for YAML ones."""
+    if path.suffix == ".json":
+        try:
+            return json.loads(path.read_text(encoding="utf-8"))
+        except json.JSONDecodeError as e:
+            raise ValueError(f"{path}: {e}") from None
+    try:
+        import yaml
+
+        from spec_loader import load_yaml
+    except ImportError:
+        raise ValueError(f"{path}: PyYAML is required for YAML chaos configs") from None
+    try:
+        return load_yaml(path)
+    except yaml.YAMLError as e:
+        raise ValueError(f"{path}: {e}") from None
+
+
+class Chaos:
+    def __init__(self, rules: Dict[str, RouteChaos], seed):
+        self.rules = rules
+        self.seed = seed
+
+    @classmethod
+    def load(cls, path: Path, seed=None) -> "Chaos":
+        """Parse a chaos config; `seed` overrides the file's. Raises ValueError on invalid configs."""
+        config = _read_config(path) or {}
+        if not isinstance(config, dict) or not isinstance(config.get("routes", {}), dict):
+            raise ValueError(f"{path}: expected a mapping with a 'routes' mapping")
+        seed = config.get("seed", 0) if seed is None else seed
+        return cls({key: RouteChaos(key, rule, seed) for key, rule in (config.get("routes") or {}).items()}, seed)
+
+    def fault(self, method: str, route: str) -> Optional[Fault]:
+        """Faults for the next request to `route`: the most specific rule wins."""
+        rule = self.rules.get(f"{method} {route}") or self.rules.get(route)
+        if rule is None and route not in INFRA_ROUTES:
+            rule = self.rules.get("*")
+        return rule.decide() if rule is not None else None
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""Per-request phase timing for the fixture runtime: `Server-Timing` headers and Prometheus `/metrics`."""
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Tuple
+
+# Phases a request handler may report, in header order.
+PHASES = ("chaos", "parse", "validate", "store", "serialize")
+# Upper bounds (seconds) of the request duration histogram buckets.
+DURATION_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+
+class RequestTimer:
+    """Accumulates time per phase for one request; created when the request line is parsed."""
+
+    __slots__ = ("started", "phases")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases: Dict[str, float] = {}
+
+    @contextmanager
+    def phase(self, name: str):
+        began = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + (time.perf_counter() - began)
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def header(self) -> str:
+        """`Server-Timing` value in milliseconds; `total` covers everything up to the response headers."""
+        parts = [f"{name};dur={self.phases[name] * 1000:.3f}" for name in PHASES if name in self.phases]
+        parts.append(f"total;dur={self.elapsed() * 1000:.3f}")
+        return ", ".join(parts)
+
+
+class Metrics:
+    """Process-wide request counters and duration histograms, rendered in Prometheus text format."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._requests: Dict[Tuple[str, str, int], int] = {}
+        # (method, route) -> [bucket counts..., +Inf count], sum of seconds
+        self._durations: Dict[Tuple[str, str], Tuple[List[int], List[float]]] = {}
+        self._phases: Dict[Tuple[str, str], float] = {}
+
+    def observe(self, method: str, route: str, status: int, timer: RequestTimer) -> None:
+        seconds = timer.elapsed()
+        slot = bisect.bisect_left(DURATION_BUCKETS, seconds)
+        with self._lock:
+            key = (method, route, status)
+            self._requests[key] = self._requests.get(key, 0) + 1
+            counts, total = self._durations.setdefault((method, route), ([0] * (len(DURATION_BUCKETS) + 1), [0.0]))
+            counts[slot] += 1
+            total[0] += seconds
+            for name, spent in timer.phases.items():
+                self._phases[(route, name)] = self._phases.get((route, name), 0.0) + spent
+
+    def render(self, gauges: Dict[str, Tuple[str, float]]) -> str:
+        """Prometheus exposition text; `gauges` maps metric name -> (help, value)."""
+        lines = [
+            "# HELP fixture_requests_total Requests served, by method, route and status.",
+            "# TYPE fixture_requests_total counter",
+        ]
+        with self._lock:
+            requests = sorted(self._requests.items())
+            durations = sorted((k, (list(c), t[0])) for k, (c, t) in self._durations.items())
+            phases = sorted(self._phases.items())
+        for (method, route, status), n in requests:
+            lines.append(f'fixture_requests_total{{method="{method}",route="{route}",status="{status}"}} {n}')
+
+        lines += [
+            "# HELP fixture_request_duration_seconds Server time per request, up to the last byte written.",
+            "# TYPE fixture_request_duration_seconds histogram",
+        ]
+        for (method, route), (counts, total) in durations:
+            labels = f'method="{method}",route="{route}"'
+            cumulative = 0
+            for bound, n in zip(DURATION_BUCKETS, counts):
+                cumulative += n
+                lines.append(f'fixture_request_duration_seconds_bucket{{{labels},le="{bound:g}"}} {cumulative}')
+            cumulative += counts[-1]
+            lines.append(f'fixture_request_duration_seconds_bucket{{{labels},le="+Inf"}} {cumulative}')
+            lines.append(f"fixture_request_duration_seconds_sum{{{labels}}} {total:.6f}")
+            lines.append(f"fixture_request_duration_seconds_count{{{labels}}} {cumulative}")
+
+        lines += [
+            "# HELP fixture_request_phase_seconds_total Handler time spent in each request phase.",
+            "# TYPE fixture_request_phase_seconds_total counter",
+        ]
+        for (route, name), spent in phases:
+            lines.append(f'fixture_request_phase_seconds_total{{route="{route}",phase="{name}"}} {spent:.6f}')
+
+        for name, (help_text, value) in sorted(gauges.items()):
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge", f"{name} {value:g}"]
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""Optional durable storage for the fixture runtime: append-only log plus compacted snapshots.
+
+Compaction runs on a background thread. The live log is first renamed to COMPACTING_LOG_FILE and
+new records go to a fresh log; the thread writes the snapshot from a frozen view of the store and
+deletes the renamed log once the snapshot is in place. Until then the renamed log still holds
+everything the old snapshot lacks, so a crash at any point loses nothing.
+"""
+import functools
+import json
+import mmap
+import os
+import sys
+import threading
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+
+SNAPSHOT_FILE = "snapshot.ndjson"
+LOG_FILE = "todos.log.ndjson"
+COMPACTING_LOG_FILE = "todos.log.compacting.ndjson"
+
+
+def _iter_records(path: Path, on_truncated: Callable[[int], None]) -> Iterator[Tuple[dict, bytes]]:
+    """Yield (record, JSON text) for each line of `path`, read through a read-only memory map.
+
+    A torn final line (a crash mid-append) ends the scan; `on_truncated` receives the offset
+    of the last complete record so the caller can cut the file back to it.
+    """
+    if not path.exists() or path.stat().st_size == 0:
+        return
+    torn_at = None
+    with path.open("rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        offset = 0
+        for line in iter(mm.readline, b""):
+            try:
+                record = json.loads(line) if line.endswith(b"\n") else None
+            except json.JSONDecodeError:
+                record = None
+            if record is None:
+                torn_at = offset
+                break
+            offset += len(line)
+            yield record, line[:-1]
+    # Called only after the map is closed, so the file can be truncated safely.
+    if torn_at is not None:
+        on_truncated(torn_at)
+
+
+class Journal:
+    """Write-ahead log of created todos, compacted into a snapshot once the log outgrows it.
+
+    The store calls append() and maybe_compact() while holding its lock, so log order always
+    matches id order. Records arrive already serialized: each is one todo's JSON object.
+    Compacting only when the log is at least as large as the last snapshot (and holds at least
+    `snapshot_every` records) keeps the total bytes rewritten proportional to the bytes logged.
+    """
+
+    def __init__(self, data_dir: Path, snapshot_every: int = 10_000):
+        self.data_dir = Path(data_dir)
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        self.snapshot_path = self.data_dir / SNAPSHOT_FILE
+        self.log_path = self.data_dir / LOG_FILE
+        self.compacting_log_path = self.data_dir / COMPACTING_LOG_FILE
+        self.snapshot_every = max(1, snapshot_every)
+        self.pending = 0
+        self.log_bytes = 0
+        self.snapshot_bytes = 0
+        self._log = None
+        self._compactor: Optional[threading.Thread] = None
+
+    def load(self) -> Iterator[Tuple[dict, bytes]]:
+        """Yield every persisted todo with its JSON text: the snapshot first, then records logged after it.
+
+        A crash after a compaction replaced the snapshot but before it deleted the renamed log
+        leaves log records the snapshot already holds; those are skipped.
+        """
+        last_id = 0
+        for record, line in _iter_records(self.snapshot_path, self._truncate_snapshot):
+            last_id = int(record["id"])
+            self.snapshot_bytes += len(line) + 1
+            yield record, line
+        for path in (self.compacting_log_path, self.log_path):
+            for record, line in _iter_records(path, functools.partial(self._truncate, path)):
+                if int(record["id"]) <= last_id:
+                    continue
+                last_id = int(record["id"])
+                self.pending += 1
+                self.log_bytes += len(line) + 1
+                yield record, line
+
+    def _truncate_snapshot(self, offset: int) -> None:
+        # Snapshots are written atomically, so a torn one means the file was damaged outside the fixture.
+        raise RuntimeError(f"corrupt fixture snapshot at byte {offset}: {self.snapshot_path}")
+
+    @staticmethod
+    def _truncate(path: Path, offset: int) -> None:
+        with path.open("r+b") as f:
+            f.truncate(offset)
+
+    def append(self, records: List[bytes]) -> None:
+        if self._log is None:
+            self._log = self.log_path.open("ab")
+        data = b"".join(record + b"\n" for record in records)
+        self._log.write(data)
+        self._log.flush()
+        self.pending += len(records)
+        self.log_bytes += len(data)
+
+    def maybe_compact(self, records: Callable[[], Iterable[bytes]]) -> None:
+        """Start a background compaction when the log is due for one and none is running.
+
+        `records()` is called here, under the store lock; it must return an iterable over a frozen
+        view of the store, since the compaction thread consumes it after the lock is released.
+        """
+        if self.pending < self.snapshot_every or self.log_bytes < self.snapshot_bytes:
+            return
+        if self._compactor is not None and self._compactor.is_alive():
+            return
+        self._rotate()
+        self._compactor = threading.Thread(
+            target=self._compact, args=(records(),), name="fixture-compaction", daemon=True
+        )
+        self._compactor.start()
+
+    def _rotate(self) -> None:
+        """Move the live log aside for the compaction and start an empty one."""
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+        if self.compacting_log_path.exists():
+            # A failed or interrupted compaction left its log behind; keep both until one succeeds.
+            if self.log_path.exists():
+                with self.compacting_log_path.open("ab") as f:
+                    f.write(self.log_path.read_bytes())
+                    f.flush()
+                    os.fsync(f.fileno())
+                self.log_path.unlink()
+        elif self.log_path.exists():
+            os.replace(self.log_path, self.compacting_log_path)
+        self.pending = 0
+        self.log_bytes = 0
+
+    def _compact(self, records: Iterable[bytes]) -> None:
+        """Write a full snapshot atomically, then drop the log it replaces; runs without the store lock."""
+        tmp = self.snapshot_path.with_suffix(".tmp")
+        size = 0
+        try:
+            with tmp.open("wb") as f:
+                for record in records:
+                    f.write(record + b"\n")
+                    size += len(record) + 1
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.snapshot_path)
+            self.compacting_log_path.unlink(missing_ok=True)
+        except OSError as e:
+            print(f"fixture: snapshot compaction failed, keeping the log: {e}", file=sys.stderr, flush=True)
+            return
+        self.snapshot_bytes = size
+
+    def close(self) -> None:
+        """Wait for a running compaction, then close the log."""
+        if self._compactor is not None:
+            self._compactor.join()
+            self._compactor = None
+        if self._log is not None:
+            self._log.close()
+            self._log = None
@@ -1,66 +1,426 @@
 #!/usr/bin/env python3
+import argparse
 import json
+import select
+import signal
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from http.server import BaseHTTPRequestHandler, HTTPServer
-from urllib.parse import urlparse
+from pathlib import Path
+from typing import Optional
+from urllib.parse import parse_qs, urlencode, urlparse
 
-TODOS = {}
-NEXT_ID = 1
+import profiling
+from fixture_chaos import Chaos
+from fixture_metrics import Metrics, RequestTimer
+from fixture_persistence import Journal
+from fixture_store import ListQuery, TodoStore, json_array
+
+# Shared by all worker threads; the store serializes access with its own lock.
+STORE = TodoStore()
+METRICS = Metrics()
+# Fault injection from --chaos; None serves every request normally.
+CHAOS: Optional[Chaos] = None
+BOOL_PARAMS = {"true": True, "false": False}
+NDJSON = "application/x-ndjson"
+# Largest accepted POST /todos:batch request.
+MAX_BATCH_ITEMS = 10_000
+# Items serialized per chunk when streaming; bounds server memory regardless of list size.
+STREAM_BATCH = 256
+# Route templates used as metric and profile labels; anything else is "unmatched".
+ROUTES = {"/health", "/metrics", "/todos", "/todos:batch"}
+# How often a worker holding an idle keep-alive connection checks whether other connections wait for it.
+IDLE_POLL_SEC = 0.05
+
+
+def route_of(path: str) -> str:
+    if path in ROUTES:
+        return path
+    if path.startswith("/todos/"):
+        return "/todos/{id}"
+    return "unmatched"
+
+
+def parse_list_query(raw_query: str) -> ListQuery:
+    """Parse GET /todos query parameters; raises ValueError naming the invalid parameter."""
+    params = {k: v[-1] for k, v in parse_qs(raw_query).items()}
+    query = ListQuery()
+    if "limit" in params:
+        if not (params["limit"].isascii() and params["limit"].isdigit()) or int(params["limit"]) < 1:
+            raise ValueError("limit")
+        query.limit = int(params["limit"])
+    if "cursor" in params:
+        if not (params["cursor"].isascii() and params["cursor"].isdigit()):
+            raise ValueError("cursor")
+        query.cursor = int(params["cursor"])
+    if "completed" in params:
+        if params["completed"] not in BOOL_PARAMS:
+            raise ValueError("completed")
+        query.completed = BOOL_PARAMS[params["completed"]]
+    query.due_from = params.get("dueDateFrom")
+    query.due_to = params.get("dueDateTo")
+    return query
+
+
+def validate_create(body) -> Optional[str]:
+    """Return the validation error for a TodoCreateRequest body, or None when it is valid."""
+    if not isinstance(body, dict):
+        return "validation: body"
+    title = body.get("title")
+    if not isinstance(title, str) or not title.strip():
+        return "validation: title"
+    return None
 
 
 class Handler(BaseHTTPRequestHandler):
-    def _json(self, code: int, payload):
-        body = json.dumps(payload).encode("utf-8")
+    # HTTP/1.1 keeps connections open between requests; every response sets Content-Length.
+    protocol_version = "HTTP/1.1"
+    # Idle keep-alive connections are dropped after this many seconds so they release their worker.
+    timeout = 30
+    # Headers and body are written separately; without TCP_NODELAY delayed ACKs stall keep-alive clients.
+    disable_nagle_algorithm = True
+
+    def handle(self):
+        """Serve requests while the connection stays open, but never hold a worker while others wait.
+
+        Between requests the connection is idle; as soon as another connection is queued for a
+        worker, the idle one is closed so its worker moves on.
+        """
+        self.close_connection = True
+        self.handle_one_request()
+        while not self.close_connection and self._wait_for_request():
+            self.handle_one_request()
+
+    def _wait_for_request(self) -> bool:
+        deadline = time.monotonic() + self.timeout
+        while True:
+            # A pipelined request may already sit in the read buffer, where select() cannot see it.
+            self.connection.setblocking(False)
+            try:
+                if self.rfile.peek(1):
+                    return True
+            except OSError:
+                return False
+            finally:
+                self.connection.settimeout(self.timeout)
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            readable, _, _ = select.select([self.connection], [], [], min(IDLE_POLL_SEC, remaining))
+            if readable:
+                return True
+            if self.server.saturated():
+                return False
+
+    def parse_request(self):
+        # Timing starts once the request line is read; header parsing counts as the parse phase.
+        self.timer = RequestTimer()
+        self.route = "unmatched"
+        self.drip = None
+        with self.timer.phase("parse"):
+            return super().parse_request()
+
+    def _send_headers(self, code: int, content_type: str, headers) -> None:
         self.send_response(code)
-        self.send_header("Content-Type", "application/json")
-        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Content-Type", content_type)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if self.server.saturated():
+            # Hand the worker to a queued connection after this response.
+            self.send_header("Connection", "close")
+        self.send_header("Server-Timing", self.timer.header())
         self.end_headers()
-        self.wfile.write(body)
+
+    def _write(self, data: bytes) -> None:
+        drip = self.drip
+        if drip is None:
+            self.wfile.write(data)
+            return
+        for start in range(0, len(data), drip.chunk_bytes):
+            time.sleep(drip.interval_sec)
+            self.wfile.write(data[start:start + drip.chunk_bytes])
+
+    def _inject_faults(self) -> bool:
+        """Apply the --chaos rule for this request; True when the fault replaced the response."""
+        fault = CHAOS.fault(self.command, self.route)
+        if fault is None:
+            return False
+        if fault.delay_sec:
+            with self.timer.phase("chaos"):
+                time.sleep(fault.delay_sec)
+        if fault.drop:
+            self.close_connection = True
+            return True
+        if fault.error_status is not None:
+            # Drain the request body so the keep-alive connection stays usable after the error.
+            self.rfile.read(int(self.headers.get("Content-Length", "0")))
+            self._json(fault.error_status, {"error": "chaos: injected failure"})
+            return True
+        self.drip = fault.drip
+        return False
+
+    def _json(self, code: int, payload, headers=None):
+        with self.timer.phase("serialize"):
+            body = json.dumps(payload).encode("utf-8")
+        self._json_bytes(code, body, headers)
+
+    def _json_bytes(self, code: int, body: bytes, headers=None):
+        """Send an already serialized JSON body."""
+        self._send_headers(code, "application/json", dict(headers or {}, **{"Content-Length": str(len(body))}))
+        self._write(body)
+        METRICS.observe(self.command, self.route, code, self.timer)
+
+    def _metrics(self):
+        gauges = {"fixture_todos": ("Todos currently in the store.", len(STORE))}
+        body = METRICS.render(gauges).encode("utf-8")
+        self._send_headers(200, "text/plain; version=0.0.4", {"Content-Length": str(len(body))})
+        self._write(body)
+        METRICS.observe(self.command, self.route, 200, self.timer)
+
+    def _ndjson(self, code: int, items, headers=None):
+        """Stream serialized JSON items as newline-delimited JSON using chunked transfer encoding.
+
+        Headers go out before the body is serialized, so `Server-Timing` stops at the store
+        phase; streamed serialization time is only visible in /metrics.
+        """
+        self._send_headers(code, NDJSON, dict(headers or {}, **{"Transfer-Encoding": "chunked"}))
+        batch = []
+        with self.timer.phase("serialize"):
+            for item in items:
+                batch.append(item)
+                if len(batch) >= STREAM_BATCH:
+                    self._write_chunk(batch)
+                    batch = []
+            if batch:
+                self._write_chunk(batch)
+        self._write(b"0\r\n\r\n")
+        METRICS.observe(self.command, self.route, code, self.timer)
+
+    def _write_chunk(self, lines):
+        data = b"\n".join(lines) + b"\n"
+        self._write(b"%X\r\n%s\r\n" % (len(data), data))
+
+    def _list_todos(self, raw_query: str):
+        try:
+            with self.timer.phase("validate"):
+                query = parse_list_query(raw_query)
+        except ValueError as e:
+            self._json(400, {"error": f"validation: {e}"})
+            return
+        streaming = NDJSON in self.headers.get("Accept", "")
+        with self.timer.phase("store"):
+            todos, next_cursor = STORE.stream(query) if streaming else STORE.list(query)
+        headers = {}
+        if next_cursor is not None:
+            # The body stays a plain array, so the next page is advertised in headers.
+            params = {k: v[-1] for k, v in parse_qs(raw_query).items()}
+            params["cursor"] = str(next_cursor)
+            headers["X-Next-Cursor"] = str(next_cursor)
+            headers["Link"] = f'</todos?{urlencode(params)}>; rel="next"'
+        if streaming:
+            self._ndjson(200, todos, headers)
+        else:
+            with self.timer.phase("serialize"):
+                body = json_array(todos)
+            self._json_bytes(200, body, headers)
 
     def do_GET(self):
-        path = urlparse(self.path).path
-        if path == "/health":
+        url = urlparse(self.path)
+        self.route = route_of(url.path)
+        if CHAOS is not None and self._inject_faults():
+            return
+        with profiling.section(f"GET {self.route}", "route"):
+            self._get(url.path, url.query)
+
+    def _get(self, path: str, raw_query: str):
+        route = self.route
+        if route == "/health":
             self._json(200, {"ok": True})
             return
-        if path == "/todos":
-            self._json(200, list(TODOS.values()))
+        if route == "/metrics":
+            self._metrics()
             return
-        if path.startswith("/todos/"):
-            todo_id = path.split("/")[-1]
-            if todo_id in TODOS:
-                self._json(200, TODOS[todo_id])
+        if route == "/todos":
+            self._list_todos(raw_query)
+            return
+        if route == "/todos/{id}":
+            with self.timer.phase("store"):
+                todo = STORE.get_json(path.split("/")[-1])
+            if todo is not None:
+                self._json_bytes(200, todo)
             else:
                 self._json(404, {"error": "not_found"})
             return
         self._json(404, {"error": "not_found"})
 
     def do_POST(self):
-        global NEXT_ID
-        path = urlparse(self.path).path
-        if path != "/todos":
+        self.route = route_of(urlparse(self.path).path)
+        if CHAOS is not None and self._inject_faults():
+            return
+        with profiling.section(f"POST {self.route}", "route"):
+            self._post()
+
+    def _post(self):
+        with self.timer.phase("parse"):
+            length = int(self.headers.get("Content-Length", "0"))
+            raw = self.rfile.read(length)
+        if self.route == "/todos":
+            self._create_todo(raw)
+        elif self.route == "/todos:batch":
+            self._create_batch(raw)
+        else:
             self._json(404, {"error": "not_found"})
+
+    def _create_todo(self, raw: bytes):
+        with self.timer.phase("parse"):
+            body = json.loads(raw or b"{}")
+        with self.timer.phase("validate"):
+            error = validate_create(body)
+        if error is not None:
+            self._json(422, {"error": error})
             return
+        with self.timer.phase("store"):
+            todo = STORE.create(body["title"], body.get("dueDate"))
+        self._json_bytes(201, todo)
 
-        length = int(self.headers.get("Content-Length", "0"))
-        body = json.loads(self.rfile.read(length) or b"{}")
-        title = body.get("title")
-        if not isinstance(title, str) or not title.strip():
-            self._json(422, {"error": "validation: title"})
+    def _create_batch(self, raw: bytes):
+        with self.timer.phase("parse"):
+            body = json.loads(raw or b"{}")
+        with self.timer.phase("validate"):
+            items = body.get("items") if isinstance(body, dict) else None
+            if not isinstance(items, list) or not items or len(items) > MAX_BATCH_ITEMS:
+                items = None
+            else:
+                errors = [validate_create(item) for item in items]
+                valid = [(item["title"], item.get("dueDate")) for item, error in zip(items, errors) if error is None]
+        if items is None:
+            self._json(422, {"error": "validation: items"})
             return
 
-        todo_id = str(NEXT_ID)
-        NEXT_ID += 1
-        todo = {"id": todo_id, "title": title, "completed": False}
-        if "dueDate" in body:
-            todo["dueDate"] = body["dueDate"]
-        TODOS[todo_id] = todo
-        self._json(201, todo)
+        # Valid items are inserted in one store call; each item gets its own status in the response.
+        with self.timer.phase("store"):
+            created = iter(STORE.create_many(valid))
+        with self.timer.phase("serialize"):
+            # Created items embed their stored fragments; the envelope matches json.dumps output.
+            results = []
+            for index, error in enumerate(errors):
+                if error is None:
+                    results.append(b'{"index": %d, "status": 201, "item": %s}' % (index, next(created)))
+                else:
+                    results.append(json.dumps({"index": index, "status": 422, "error": error}).encode("utf-8"))
+            body = b'{"created": %d, "failed": %d, "results": %s}' % (
+                len(valid), len(items) - len(valid), json_array(results)
+            )
+        self._json_bytes(200, body)
 
     def log_message(self, *_args):
         return
 
 
+class PooledHTTPServer(HTTPServer):
+    """HTTPServer that hands each connection to a bounded pool of worker threads.
+
+    Workers keep a connection across keep-alive requests only while no other connection is
+    waiting; see Handler.handle.
+    """
+
+    def __init__(self, address, handler, workers: int):
+        self.workers = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="fixture-worker")
+        self._queued = 0
+        self._queued_lock = threading.Lock()
+        super().__init__(address, handler)
+
+    def saturated(self) -> bool:
+        """Whether accepted connections are waiting for a free worker."""
+        return self._queued > 0
+
+    def process_request(self, request, client_address):
+        with self._queued_lock:
+            self._queued += 1
+        self.workers.submit(self._serve_connection, request, client_address)
+
+    def _serve_connection(self, request, client_address):
+        with self._queued_lock:
+            self._queued -= 1
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self.workers.shutdown(wait=False)
+
+
 def main():
-    HTTPServer(("127.0.0.1", 38080), Handler).serve_forever()
+    parser = argparse.ArgumentParser(description="Deterministic in-memory runtime for flow evaluation.")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to bind")
+    parser.add_argument("--port", type=int, default=38080, help="Port to bind")
+    parser.add_argument("--data-dir", default="", help="Persist todos in this directory and reload them on start")
+    parser.add_argument(
+        "--snapshot-every",
+        type=int,
+        default=10_000,
+        help="With --data-dir: minimum records logged before the log is compacted into a snapshot",
+    )
+    parser.add_argument("--ready-file", default="", help="Touch this file once the port is bound")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=16,
+        help="Worker threads; each serves one keep-alive connection at a time",
+    )
+    parser.add_argument(
+        "--profile", choices=profiling.MODES, default="", help="Profile request handling per route until shutdown"
+    )
+    parser.add_argument(
+        "--profile-out", default="fixture-profile", help="Path prefix for --profile output (default: fixture-profile)"
+    )
+    parser.add_argument("--chaos", default="", help="Inject delays, 5xx errors, drops and slow bodies per this config")
+    parser.add_argument("--chaos-seed", type=int, default=None, help="Override the chaos config's RNG seed")
+    args = parser.parse_args()
+    if args.workers < 1:
+        parser.error("--workers must be >= 1")
+    if args.snapshot_every < 1:
+        parser.error("--snapshot-every must be >= 1")
+    global CHAOS
+    if args.chaos:
+        try:
+            CHAOS = Chaos.load(Path(args.chaos), args.chaos_seed)
+        except (OSError, ValueError) as e:
+            parser.error(f"--chaos: {e}")
+        print(f"fixture: chaos rules for {', '.join(CHAOS.rules) or 'no routes'} (seed {CHAOS.seed})")
+
+    # Load before binding, so readiness probes measure the time to restore the dataset.
+    journal = None
+    if args.data_dir:
+        started = time.perf_counter()
+        journal = Journal(Path(args.data_dir), args.snapshot_every)
+        count = STORE.restore(journal.load())
+        STORE.journal = journal
+        print(f"fixture: restored {count} todos from {args.data_dir} in {(time.perf_counter() - started) * 1000:.1f} ms")
+
+    profiler = profiling.configure(args.profile, "route") if args.profile else None
+    # The evaluator stops the runtime with SIGTERM; exit through `finally` so the journal and profile are flushed.
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    server = PooledHTTPServer((args.host, args.port), Handler, args.workers)
+    print(f"fixture: listening on http://{args.host}:{server.server_address[1]}", flush=True)
+    if args.ready_file:
+        Path(args.ready_file).touch()
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        if journal is not None:
+            with STORE.lock:
+                journal.close()
+        if profiler is not None:
+            for path in profiler.write(Path(args.profile_out)):
+                print(f"fixture: wrote profile {path}", flush=True)
 
 
 if __name__ == "__main__":
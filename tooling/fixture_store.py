@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""In-memory todo store for the fixture runtime, with secondary indexes for list queries.
+
+Todos are kept in columns indexed by integer id rather than as one dict per item: the response
+JSON of each todo is serialized once at insert time and stored as bytes, next to a byte per
+`completed` flag and the (interned) `dueDate` used by filters. Indexes hold ids in `array('q')`,
+8 bytes per entry instead of a pointer plus an int object. Responses are assembled by joining the
+stored fragments, so reads never re-serialize a todo.
+"""
+import bisect
+import heapq
+import itertools
+import json
+import sys
+import threading
+from array import array
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+
+# Up to this many dueDate matches are sorted into id order; wider ranges merge the per-date runs.
+DUE_DATE_SORT_LIMIT = 4096
+
+
+class ListQuery:
+    __slots__ = ("limit", "cursor", "completed", "due_from", "due_to")
+
+    def __init__(
+        self,
+        limit: Optional[int] = None,
+        cursor: Optional[int] = None,
+        completed: Optional[bool] = None,
+        due_from: Optional[str] = None,
+        due_to: Optional[str] = None,
+    ):
+        self.limit = limit
+        self.cursor = cursor
+        self.completed = completed
+        self.due_from = due_from
+        self.due_to = due_to
+
+    @property
+    def has_due_range(self) -> bool:
+        return self.due_from is not None or self.due_to is not None
+
+    def matches(self, completed: bool, due: Optional[str]) -> bool:
+        if self.completed is not None and completed is not self.completed:
+            return False
+        if self.has_due_range:
+            if due is None:
+                return False
+            if self.due_from is not None and due < self.due_from:
+                return False
+            if self.due_to is not None and due > self.due_to:
+                return False
+        return True
+
+
+def fragment(todo_id: int, title: str, due_date=None, completed: bool = False) -> bytes:
+    """The todo's JSON object, byte-identical to `json.dumps` of its dict form."""
+    text = '{"id": "%d", "title": %s, "completed": %s' % (todo_id, json.dumps(title), "true" if completed else "false")
+    if due_date is not None:
+        text += ', "dueDate": ' + json.dumps(due_date)
+    return (text + "}").encode("utf-8")
+
+
+def json_array(fragments: Iterable[bytes]) -> bytes:
+    return b"[" + b", ".join(fragments) + b"]"
+
+
+class TodoStore:
+    """Todos keyed by integer id, listed in id order.
+
+    Position `id - 1` of every column belongs to that id; ids are issued in increasing order and
+    never removed, so lookups are O(1) list indexing. Secondary indexes: ids per `completed`
+    value and ids ordered by (dueDate, id), so cursor pages and filtered pages cost
+    O(log n + page) instead of a scan of the whole store.
+    """
+
+    def __init__(self, journal=None):
+        self.lock = threading.Lock()
+        # Optional fixture_persistence.Journal; called under the lock after every insert.
+        self.journal = journal
+        # Columns; a restored snapshot with gaps in its ids leaves None fragments.
+        self._json: List[Optional[bytes]] = []
+        self._completed = bytearray()
+        self._due: List[Optional[str]] = []
+        self._count = 0
+        self._by_completed = {False: array("q"), True: array("q")}
+        self._by_due = array("q")
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _due_key(self, todo_id: int) -> Tuple[str, int]:
+        return self._due[todo_id - 1], todo_id
+
+    def create(self, title: str, due_date=None) -> bytes:
+        """Insert a todo; returns its JSON fragment."""
+        with self.lock:
+            todo_id = self._insert(title, due_date, False, None, sort_due=True)
+            self._persist(todo_id, todo_id + 1)
+            return self._json[todo_id - 1]
+
+    def create_many(self, items: List[Tuple[str, object]]) -> List[bytes]:
+        """Insert (title, dueDate) pairs under a single lock acquisition; ids are contiguous."""
+        with self.lock:
+            first = len(self._json) + 1
+            for title, due_date in items:
+                self._insert(title, due_date, False, None, sort_due=True)
+            self._persist(first, first + len(items))
+            return self._json[first - 1:]
+
+    def restore(self, todos: Iterable[Tuple[dict, bytes]]) -> int:
+        """Bulk-load persisted (todo, JSON text) pairs in id order without journaling them again.
+
+        The persisted text becomes the todo's fragment, so restoring never re-serializes.
+        """
+        with self.lock:
+            count = 0
+            for todo, data in todos:
+                todo_id = int(todo["id"])
+                if todo_id <= len(self._json):
+                    raise ValueError(f"persisted todo ids are not increasing at id {todo_id}")
+                gap = todo_id - 1 - len(self._json)
+                if gap:
+                    self._json.extend([None] * gap)
+                    self._completed.extend(bytes(gap))
+                    self._due.extend([None] * gap)
+                self._insert(todo["title"], todo.get("dueDate"), bool(todo["completed"]), data, False)
+                count += 1
+            self._by_due = array("q", sorted(self._by_due, key=self._due_key))
+            return count
+
+    def _insert(self, title: str, due_date, completed: bool, data: Optional[bytes], sort_due: bool) -> int:
+        todo_id = len(self._json) + 1
+        self._json.append(data if data is not None else fragment(todo_id, title, due_date, completed))
+        self._completed.append(completed)
+        # Ids are issued in increasing order, so appends keep the id arrays sorted.
+        self._by_completed[completed].append(todo_id)
+        self._count += 1
+        if isinstance(due_date, str):
+            # Lists are often filtered on a handful of dates; share one string per date.
+            self._due.append(sys.intern(due_date))
+            if sort_due:
+                bisect.insort(self._by_due, todo_id, key=self._due_key)
+            else:
+                self._by_due.append(todo_id)
+        else:
+            self._due.append(None)
+        return todo_id
+
+    def _persist(self, first: int, end: int) -> None:
+        if self.journal is not None:
+            self.journal.append(self._json[first - 1:end - 1])
+            self.journal.maybe_compact(lambda: self._fragments(len(self._json)))
+
+    def _fragments(self, end: int) -> Iterator[bytes]:
+        """Fragments of ids up to `end`; safe to consume without the lock while the columns grow."""
+        return (data for data in itertools.islice(self._json, end) if data is not None)
+
+    def get_json(self, todo_id: str) -> Optional[bytes]:
+        """The todo's JSON fragment, or None for unknown ids."""
+        # str.isdigit() also accepts digits int() rejects, such as "²".
+        if not (todo_id.isascii() and todo_id.isdigit()):
+            return None
+        index = int(todo_id) - 1
+        with self.lock:
+            return self._json[index] if 0 <= index < len(self._json) else None
+
+    def get(self, todo_id: str) -> Optional[dict]:
+        data = self.get_json(todo_id)
+        return json.loads(data) if data is not None else None
+
+    def _candidates(self, query: ListQuery) -> Iterator[int]:
+        """Ids after the query's cursor that may match, in id order; caller holds the lock while consuming it.
+
+        Besides dueDate merges, the iterators stop at the ids present when they were created.
+        """
+        cursor = query.cursor
+        if query.has_due_range:
+            lo = 0
+            if query.due_from is not None:
+                lo = bisect.bisect_left(self._by_due, (query.due_from,), key=self._due_key)
+            hi = len(self._by_due)
+            if query.due_to is not None:
+                hi = bisect.bisect_right(self._by_due, (query.due_to, float("inf")), key=self._due_key)
+            if hi - lo > DUE_DATE_SORT_LIMIT:
+                return self._merge_due_runs(lo, hi, cursor)
+            ids: Sequence[int] = sorted(self._by_due[lo:hi])
+        elif query.completed is not None:
+            ids = self._by_completed[query.completed]
+        else:
+            return iter(range((cursor or 0) + 1, len(self._json) + 1))
+        start = 0 if cursor is None else bisect.bisect_right(ids, cursor)
+        return map(ids.__getitem__, range(start, len(ids)))
+
+    def _merge_due_runs(self, lo: int, hi: int, cursor: Optional[int]) -> Iterator[int]:
+        """Ids at `_by_due[lo:hi]` after `cursor`, in id order.
+
+        The slice is one run per dueDate, each already in id order, so a page costs a bisect per date
+        in the range plus a heap merge of `limit` ids rather than a pass over the whole store.
+        """
+        runs = []
+        while lo < hi:
+            due = self._due[self._by_due[lo] - 1]
+            end = bisect.bisect_right(self._by_due, (due, float("inf")), lo, hi, key=self._due_key)
+            start = lo
+            if cursor is not None:
+                start = bisect.bisect_right(self._by_due, (due, cursor), lo, end, key=self._due_key)
+            runs.append(map(self._by_due.__getitem__, range(start, end)))
+            lo = end
+        return heapq.merge(*runs)
+
+    def _scan(self, candidates: Iterator[int], query: ListQuery) -> Iterator[int]:
+        for todo_id in candidates:
+            index = todo_id - 1
+            if self._json[index] is not None and query.matches(bool(self._completed[index]), self._due[index]):
+                yield todo_id
+
+    def list(self, query: ListQuery) -> Tuple[List[bytes], Optional[int]]:
+        """Return one page of todo JSON fragments in id order plus the cursor for the next page, if any."""
+        with self.lock:
+            page: List[bytes] = []
+            last_id = None
+            next_cursor = None
+            for todo_id in self._scan(self._candidates(query), query):
+                if query.limit is not None and len(page) == query.limit:
+                    next_cursor = last_id
+                    break
+                page.append(self._json[todo_id - 1])
+                last_id = todo_id
+            return page, next_cursor
+
+    def stream(self, query: ListQuery) -> Tuple[Iterator[bytes], Optional[int]]:
+        """Like list(), but an unlimited query yields fragments lazily instead of building the page.
+
+        Todos are never removed and columns only grow, so the scan can run without the lock over
+        the ids that existed when it started. dueDate inserts reorder `_by_due`, so a dueDate
+        range collects its candidate ids under the lock first.
+        """
+        if query.limit is not None:
+            page, next_cursor = self.list(query)
+            return iter(page), next_cursor
+        with self.lock:
+            candidates = self._candidates(query)
+            if query.has_due_range:
+                candidates = iter(list(candidates))
+        return (self._json[todo_id - 1] for todo_id in self._scan(candidates, query)), None
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""`expect_body` assertions applied to flow step responses.
+
+Each step's `expect_body` is compiled once, when spec_loader builds the Step, into an AssertionPlan:
+a tuple of (checker, arguments) pairs with field sets, expected values and length bounds resolved up
+front, so checking a response does no dict interpretation. Checkers are module functions and their
+arguments plain data, so plans are pickled with the spec cache as they are.
+
+Array checks run over the whole list in C (`map` with an `itemgetter`) and only walk it item by
+item to build the message once they have found a failure.
+"""
+import operator
+from collections import deque
+from typing import Any, Callable, List, Optional, Tuple
+
+Check = Tuple[Callable[..., None], tuple]
+# (item, index) -> error message or None; e.g. a response schema check for each streamed item.
+ItemCheck = Callable[[Any, int], Optional[str]]
+
+# Array assertions that can be evaluated one item at a time on a streamed (NDJSON) list.
+STREAMABLE = {"length_equals", "length_gte", "length_lte", "all_have_fields", "all_equal"}
+LENGTH_CHECKS = {
+    "length_equals": ("", operator.eq),
+    "length_gte": (">= ", operator.ge),
+    "length_lte": ("<= ", operator.le),
+}
+
+
+def _has_fields(body, prefix: str, fields: Tuple[str, ...], get: Callable) -> None:
+    if not isinstance(body, dict):
+        raise AssertionError(f"{prefix} expected JSON object body for has_fields")
+    try:
+        get(body)
+    except KeyError:
+        missing = next(f for f in fields if f not in body)
+        raise AssertionError(f"{prefix} missing expected field '{missing}'") from None
+
+
+def _equals(body, prefix: str, pairs: Tuple[Tuple[str, Any], ...], get: Callable, expected) -> None:
+    if not isinstance(body, dict):
+        raise AssertionError(f"{prefix} expected JSON object body for equals")
+    try:
+        if get(body) == expected:
+            return
+    except KeyError:
+        pass
+    for k, v in pairs:
+        if body.get(k) != v:
+            raise AssertionError(f"{prefix} expected body[{k!r}] == {v!r}, got {body.get(k)!r}")
+
+
+def _contains(body, prefix: str, pairs: Tuple[Tuple[str, Any], ...]) -> None:
+    if isinstance(body, dict):
+        for k, v in pairs:
+            actual = body.get(k)
+            if v not in (actual if type(actual) is str else str(actual)):
+                raise AssertionError(f"{prefix} expected body[{k!r}] to contain {v!r}, got {actual!r}")
+    else:
+        raw = str(body)
+        for _, v in pairs:
+            if v not in raw:
+                raise AssertionError(f"{prefix} expected response body to contain {v!r}")
+
+
+def _length(body, prefix: str, key: str, bound: int) -> None:
+    op, ok = LENGTH_CHECKS[key]
+    if not isinstance(body, list):
+        raise AssertionError(f"{prefix} expected JSON array body for {key}")
+    if not ok(len(body), bound):
+        raise AssertionError(f"{prefix} expected array length {op}{bound}, got {len(body)}")
+
+
+def _all_have_fields(body, prefix: str, fields: Tuple[str, ...], required: frozenset, get: Callable) -> None:
+    if not isinstance(body, list):
+        raise AssertionError(f"{prefix} expected JSON array body for all_have_fields")
+    try:
+        # `get` fetches every field: KeyError on a missing one, TypeError on a non-object item.
+        deque(map(get, body), maxlen=0)
+        return
+    except (KeyError, TypeError):
+        pass
+    for idx, item in enumerate(body):
+        if not isinstance(item, dict):
+            raise AssertionError(f"{prefix} expected object at index {idx} in array")
+        if not item.keys() >= required:
+            missing = next(f for f in fields if f not in item)
+            raise AssertionError(f"{prefix} item {idx} missing field '{missing}'")
+
+
+def _all_equal(body, prefix: str, pairs: Tuple[Tuple[str, Any], ...], get: Optional[Callable], expected) -> None:
+    if not isinstance(body, list):
+        raise AssertionError(f"{prefix} expected JSON array body for all_equal")
+    if get is None:
+        return
+    try:
+        # `get` is an itemgetter over the keys; a missing key or non-object item takes the slow path.
+        if list(map(get, body)).count(expected) == len(body):
+            return
+    except (KeyError, TypeError):
+        pass
+    for idx, item in enumerate(body):
+        for k, v in pairs:
+            if not isinstance(item, dict) or item.get(k) != v:
+                actual = item.get(k) if isinstance(item, dict) else item
+                raise AssertionError(f"{prefix} expected item {idx}[{k!r}] == {v!r}, got {actual!r}")
+
+
+def _getter(keys: Tuple[str, ...]) -> Optional[Callable]:
+    return operator.itemgetter(*keys) if keys else None
+
+
+def _values(pairs: Tuple[Tuple[str, Any], ...]):
+    """What `_getter` of the pairs' keys returns for a matching object: one value, or a tuple of several."""
+    return pairs[0][1] if len(pairs) == 1 else tuple(v for _, v in pairs)
+
+
+class AssertionPlan:
+    """One step's `expect_body`, compiled; checks run in the order the keys are documented."""
+
+    __slots__ = ("prefix", "checks", "capture_id", "fields", "equal", "lengths", "unstreamable")
+
+    def __init__(self, flow_name: str, step_index: int, expect: Optional[dict]):
+        expect = expect or {}
+        prefix = self.prefix = f"{flow_name}:step#{step_index}"
+        checks: List[Check] = []
+        if "has_fields" in expect:
+            fields = tuple(expect["has_fields"])
+            checks.append((_has_fields, (prefix, fields, _getter(fields) or dict.keys)))
+        if "equals" in expect:
+            pairs = tuple(expect["equals"].items())
+            checks.append((_equals, (prefix, pairs, _getter(tuple(k for k, _ in pairs)) or dict.keys, _values(pairs))))
+        if "contains" in expect:
+            checks.append((_contains, (prefix, tuple(expect["contains"].items()))))
+        self.lengths: Tuple[Tuple[str, int], ...] = tuple(
+            (key, int(expect[key])) for key in LENGTH_CHECKS if key in expect
+        )
+        checks.extend((_length, (prefix, key, bound)) for key, bound in self.lengths)
+        self.fields: Tuple[str, ...] = tuple(expect.get("all_have_fields", ()))
+        if "all_have_fields" in expect:
+            # With no fields, dict.keys still rejects non-object items.
+            get = _getter(self.fields) or dict.keys
+            checks.append((_all_have_fields, (prefix, self.fields, frozenset(self.fields), get)))
+        self.equal: Tuple[Tuple[str, Any], ...] = tuple(expect.get("all_equal", {}).items())
+        if "all_equal" in expect:
+            get = _getter(tuple(k for k, _ in self.equal))
+            checks.append((_all_equal, (prefix, self.equal, get, _values(self.equal))))
+        self.checks: Tuple[Check, ...] = tuple(checks)
+        # An empty expect_body leaves the context untouched.
+        self.capture_id = bool(expect)
+        self.unstreamable = sorted(set(expect) - STREAMABLE)
+
+    def check(self, resp_body, context: dict) -> None:
+        for check, args in self.checks:
+            check(resp_body, *args)
+        # Persist common IDs for later steps.
+        if self.capture_id and isinstance(resp_body, dict) and "id" in resp_body:
+            context["id"] = resp_body["id"]
+
+    def streaming(self, item_error: Optional[ItemCheck] = None) -> "StreamingListCheck":
+        if self.unstreamable:
+            raise AssertionError(f"{self.prefix} assertions {self.unstreamable} cannot be checked on a streamed list")
+        return StreamingListCheck(self, item_error)
+
+
+def assert_expectations(flow_name: str, step_index: int, expect: dict, resp_body, context: dict):
+    """Compile and apply `expect` in one go; flow steps reuse the plan compiled in `Step.assertions`."""
+    AssertionPlan(flow_name, step_index, expect).check(resp_body, context)
+
+
+class StreamingListCheck:
+    """Checks a plan's array assertions item by item, keeping only a running count."""
+
+    def __init__(self, plan: AssertionPlan, item_error: Optional[ItemCheck] = None):
+        self.prefix = plan.prefix
+        self.item_error = item_error
+        self.required = frozenset(plan.fields)
+        self.fields = plan.fields
+        self.equal = plan.equal
+        self.lengths = plan.lengths
+        self.per_item = bool(self.fields or self.equal)
+        self.count = 0
+        self.error: Optional[str] = None
+
+    def feed(self, item) -> None:
+        idx = self.count
+        self.count += 1
+        if self.error is not None:
+            return
+        if self.per_item:
+            self.error = self._expectation_error(item, idx)
+        if self.error is None and self.item_error is not None:
+            message = self.item_error(item, idx)
+            if message is not None:
+                self.error = f"{self.prefix} {message}"
+
+    def _expectation_error(self, item, idx: int) -> Optional[str]:
+        if not isinstance(item, dict):
+            return f"{self.prefix} expected object at index {idx} in array"
+        if not item.keys() >= self.required:
+            missing = next(f for f in self.fields if f not in item)
+            return f"{self.prefix} item {idx} missing field '{missing}'"
+        for k, v in self.equal:
+            if item.get(k) != v:
+                return f"{self.prefix} expected item {idx}[{k!r}] == {v!r}, got {item.get(k)!r}"
+        return None
+
+    def finish(self) -> None:
+        if self.error is not None:
+            raise AssertionError(self.error)
+        n = self.count
+        for key, bound in self.lengths:
+            if key == "length_equals" and n != bound:
+                raise AssertionError(f"{self.prefix} expected array length {bound}, got {n}")
+            if key == "length_gte" and n < bound:
+                raise AssertionError(f"{self.prefix} expected array length >= {bound}, got {n}")
+            if key == "length_lte" and n > bound:
+                raise AssertionError(f"{self.prefix} expected array length <= {bound}, got {n}")
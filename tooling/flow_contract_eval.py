@@ -1,19 +1,18 @@
 #!/usr/bin/env python3
-import glob
+import argparse
+import json
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import List, Tuple
 
-import yaml
+import spec_loader
+from contract_coverage import CACHE_DIR, CoverageIndex, format_coverage
+from flow_versions import VersionResult, format_matrix, prefixed
 
 ROOT = Path(__file__).resolve().parents[1]
 
-ACTION_MAP = {
-    "health_check": ("/health", "get"),
-    "create_todo": ("/todos", "post"),
-    "list_todos": ("/todos", "get"),
-    "get_todo": ("/todos/{id}", "get"),
-}
-
 
 def fail(msg: str) -> None:
     print(f"FAIL: {msg}")
@@ -23,53 +22,100 @@ def ok(msg: str) -> None:
     print(f"OK: {msg}")
 
 
-def load_yaml(p: Path):
-    return yaml.safe_load(p.read_text(encoding="utf-8"))
+def check_step(api, flow, step, errors: List[str]) -> None:
+    i = step.index
+    if step.method is None:
+        errors.append(f"{flow.file}:step#{i} unknown action '{step.action}' (add to ACTION_MAP)")
+        return
+    method, api_path = step.method.lower(), step.path
+    op = api.operation(method, api_path)
+    if op is None:
+        errors.append(f"{flow.file}:step#{i} missing operation {method.upper()} {api_path} in api/openapi.yaml")
+        return
+    query_params = set(step.query) | set(step.query_from_previous)
+    for name in sorted(query_params - op.query_params):
+        errors.append(
+            f"{flow.file}:step#{i} uses query parameter '{name}' not declared for {method.upper()} {api_path}"
+        )
+    if step.expect_status is not None:
+        code = str(step.expect_status)
+        if code not in op.responses:
+            errors.append(
+                f"{flow.file}:step#{i} expects status {code} but {method.upper()} {api_path} does not declare it"
+            )
+
+
+def check_version(
+    api, version: str, missing_label: str = "pinned version", use_cache: bool = True
+) -> Tuple[VersionResult, CoverageIndex]:
+    """Check one version's flows, re-checking only flows whose file or operations changed since the last run."""
+    started = time.perf_counter()
+    index = CoverageIndex(version, api, CACHE_DIR if use_cache else None)
+    try:
+        flows = spec_loader.load_flows(version)
+    except ValueError as e:
+        return VersionResult(version, 0, errors=[f"invalid flow fixture: {e}"]), index
+    result = VersionResult(version, len(flows))
+    if not flows:
+        result.errors.append(f"no flow files found for {missing_label} {version}")
+    for flow in flows:
+        for step_errors in index.check_flow(flow, lambda step, errors: check_step(api, flow, step, errors)):
+            result.errors.extend(step_errors)
+            result.total_steps += 1
+            result.failed_steps += bool(step_errors)
+    index.save()
+    result.elapsed_sec = time.perf_counter() - started
+    return result, index
 
 
 def main() -> int:
-    version = (ROOT / "spec/VERSION").read_text(encoding="utf-8").strip()
-    openapi_path = ROOT / "api/openapi.yaml"
-    flow_glob = str(ROOT / f"spec/starter-spec-v{version}/flows/*.yaml")
-
-    spec = load_yaml(openapi_path)
-    paths = spec.get("paths", {})
-
-    errors: list[str] = []
-    flow_files = sorted(glob.glob(flow_glob))
-    if not flow_files:
-        errors.append(f"no flow files found for pinned version {version}")
-
-    for flow_file in flow_files:
-        flow_path = Path(flow_file)
-        flow = load_yaml(flow_path)
-        steps = flow.get("steps", [])
-        for i, step in enumerate(steps, start=1):
-            action = step.get("action")
-            status = step.get("expect_status")
-            if action not in ACTION_MAP:
-                errors.append(f"{flow_path.name}:step#{i} unknown action '{action}' (add to ACTION_MAP)")
-                continue
-            api_path, method = ACTION_MAP[action]
-            op = paths.get(api_path, {}).get(method)
-            if op is None:
-                errors.append(f"{flow_path.name}:step#{i} missing operation {method.upper()} {api_path} in api/openapi.yaml")
-                continue
-            if status is not None:
-                code = str(status)
-                responses = op.get("responses", {})
-                if code not in responses:
-                    errors.append(
-                        f"{flow_path.name}:step#{i} expects status {code} but {method.upper()} {api_path} does not declare it"
-                    )
-
-    if errors:
-        for e in errors:
+    parser = argparse.ArgumentParser(description="Check pinned flow fixtures against api/openapi.yaml.")
+    parser.add_argument(
+        "--versions",
+        default="",
+        help="Comma-separated spec versions to check in one run, or 'all' (default: spec/VERSION)",
+    )
+    parser.add_argument("--coverage-report", default="", help="Write the contract coverage index as JSON to this path")
+    parser.add_argument("--no-cache", action="store_true", help="Re-check every flow instead of only changed ones")
+    args = parser.parse_args()
+    try:
+        versions = spec_loader.resolve_versions(args.versions)
+    except ValueError as e:
+        parser.error(str(e))
+    api = spec_loader.load_api(ROOT / "api/openapi.yaml")
+
+    use_cache = not args.no_cache
+
+    if len(versions) == 1:
+        result, index = check_version(api, versions[0], use_cache=use_cache)
+        results = [result]
+        coverage = [index.report()]
+        for e in result.errors:
             fail(e)
-        return 1
-
-    ok(f"flow contract eval passed for spec v{version} ({len(flow_files)} flow files)")
-    return 0
+        if result.passed:
+            ok(f"flow contract eval passed for spec v{result.version} ({result.flows} flow files)")
+    else:
+        # One parsed contract is shared; each version's flows are checked on their own.
+        with ThreadPoolExecutor(max_workers=len(versions)) as pool:
+            runs = list(pool.map(lambda v: check_version(api, v, "spec version", use_cache), versions))
+        results = [result for result, _ in runs]
+        coverage = [index.report() for _, index in runs]
+        for result in results:
+            for e in prefixed(result.version, result.errors):
+                fail(e)
+            if result.passed:
+                ok(f"flow contract eval passed for spec v{result.version} ({result.flows} flow files)")
+        for line in format_matrix([r.to_dict() for r in results]):
+            print(line)
+    for report in coverage:
+        for line in format_coverage(report):
+            print(line)
+    if args.coverage_report:
+        path = Path(args.coverage_report)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps({"versions": coverage}, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+        ok(f"wrote contract coverage report to {path}")
+    return 0 if all(r.passed for r in results) else 1
 
 
 if __name__ == "__main__":
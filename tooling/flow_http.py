@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""Keep-alive HTTP/1.1 client used by the runtime flow evaluator."""
+import contextlib
+import http.client
+import select
+import socket
+import threading
+import time
+import urllib.parse
+from typing import Dict, Iterator, List, NamedTuple, Optional
+
+DEFAULT_POOL_SIZE = 4
+STREAM_BLOCK_SIZE = 64 * 1024
+
+# Errors that mean a reused keep-alive socket was closed by the server.
+STALE_CONNECTION_ERRORS = (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError)
+# A server may have acted on a request it dropped after reading; only these are resent on a fresh connection
+# once the request went out. Requests whose send itself failed never reached the server and are always resent.
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE", "TRACE"})
+
+
+class Response(NamedTuple):
+    status: int
+    headers: Dict[str, str]
+    body: bytes
+    connect_ms: float
+    request_ms: float
+    # 1 when a stale keep-alive connection failed and the request was resent on a fresh one.
+    reconnects: int = 0
+
+
+class StreamResponse:
+    """Response whose body is read line by line from the socket (chunked or not)."""
+
+    def __init__(self, resp: http.client.HTTPResponse, connect_ms: float, started: float, reconnects: int):
+        self.status = resp.status
+        self.headers = _headers(resp)
+        self.connect_ms = connect_ms
+        self.reconnects = reconnects
+        self._resp = resp
+        self._started = started
+
+    def iter_lines(self) -> Iterator[bytes]:
+        # Reading blocks and splitting is much cheaper than HTTPResponse.readline() per line.
+        pending = b""
+        while True:
+            block = self._resp.read1(STREAM_BLOCK_SIZE)
+            if not block:
+                break
+            lines = (pending + block).split(b"\n")
+            pending = lines.pop()
+            yield from lines
+        if pending:
+            yield pending
+
+    def read(self) -> bytes:
+        return self._resp.read()
+
+    def elapsed_ms(self) -> float:
+        """Time from sending the request until now; call after the body has been consumed."""
+        return (time.perf_counter() - self._started) * 1000
+
+
+def _headers(resp: http.client.HTTPResponse) -> Dict[str, str]:
+    return {k.lower(): v for k, v in resp.getheaders()}
+
+
+class ConnectionPool:
+    """Persistent connections to a single scheme://host:port.
+
+    Requests never wait for a connection: when every idle one is in use a new one is opened.
+    `size` bounds only the idle connections kept for reuse; extra ones are closed when released.
+    """
+
+    def __init__(self, base_url: str, size: int = DEFAULT_POOL_SIZE):
+        parts = urllib.parse.urlsplit(base_url)
+        self.scheme = parts.scheme or "http"
+        self.host = parts.hostname or "127.0.0.1"
+        self.port = parts.port
+        self.size = max(1, size)
+        self._idle: List[http.client.HTTPConnection] = []
+        self._lock = threading.Lock()
+
+    def _new_connection(self, timeout: float) -> http.client.HTTPConnection:
+        cls = http.client.HTTPSConnection if self.scheme == "https" else http.client.HTTPConnection
+        return cls(self.host, self.port, timeout=timeout)
+
+    def _checkout(self, timeout: float):
+        while True:
+            with self._lock:
+                conn = self._idle.pop() if self._idle else None
+            if conn is None:
+                break
+            if conn.sock is None or select.select([conn.sock], [], [], 0)[0]:
+                # An idle keep-alive socket only turns readable when the server closed it.
+                conn.close()
+                continue
+            conn.timeout = timeout
+            conn.sock.settimeout(timeout)
+            return conn, 0.0, True
+        conn, connect_ms = self._connect(timeout)
+        return conn, connect_ms, False
+
+    def _connect(self, timeout: float):
+        conn = self._new_connection(timeout)
+        started = time.perf_counter()
+        conn.connect()
+        conn.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return conn, (time.perf_counter() - started) * 1000
+
+    def _open(self, method: str, target: str, body: Optional[bytes], headers: Dict[str, str], timeout: float):
+        """Send a request on a pooled connection; returns (conn, response, connect_ms, started, reconnects)."""
+        conn, connect_ms, reused = self._checkout(timeout)
+        sent = False
+        try:
+            started = time.perf_counter()
+            conn.request(method, target, body=body, headers=headers)
+            sent = True
+            return conn, conn.getresponse(), connect_ms, started, 0
+        except STALE_CONNECTION_ERRORS:
+            conn.close()
+            if not reused or (sent and method not in IDEMPOTENT_METHODS):
+                raise
+        except Exception:
+            conn.close()
+            raise
+        conn, connect_ms = self._connect(timeout)
+        try:
+            started = time.perf_counter()
+            conn.request(method, target, body=body, headers=headers)
+            return conn, conn.getresponse(), connect_ms, started, 1
+        except Exception:
+            conn.close()
+            raise
+
+    def _release(self, conn: http.client.HTTPConnection, resp: http.client.HTTPResponse) -> None:
+        # A connection can only be reused once its response has been read to the end.
+        if resp.will_close or not resp.isclosed():
+            conn.close()
+        else:
+            with self._lock:
+                if len(self._idle) < self.size:
+                    self._idle.append(conn)
+                    return
+            conn.close()
+
+    def request(
+        self,
+        method: str,
+        target: str,
+        body: Optional[bytes] = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: float = 10.0,
+    ) -> Response:
+        conn, resp, connect_ms, started, reconnects = self._open(method, target, body, dict(headers or {}), timeout)
+        try:
+            data = resp.read()
+        except Exception:
+            conn.close()
+            raise
+        request_ms = (time.perf_counter() - started) * 1000
+        self._release(conn, resp)
+        return Response(resp.status, _headers(resp), data, connect_ms, request_ms, reconnects)
+
+    @contextlib.contextmanager
+    def stream(
+        self,
+        method: str,
+        target: str,
+        body: Optional[bytes] = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: float = 10.0,
+    ) -> Iterator["StreamResponse"]:
+        """Yield a response whose body is consumed incrementally instead of buffered."""
+        conn, resp, connect_ms, started, reconnects = self._open(method, target, body, dict(headers or {}), timeout)
+        try:
+            yield StreamResponse(resp, connect_ms, started, reconnects)
+        finally:
+            self._release(conn, resp)
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+
+_POOLS: Dict[str, ConnectionPool] = {}
+_POOLS_LOCK = threading.Lock()
+_pool_size = DEFAULT_POOL_SIZE
+
+
+def configure(pool_size: int) -> None:
+    global _pool_size
+    _pool_size = max(1, pool_size)
+
+
+def pool_for(url: str) -> ConnectionPool:
+    parts = urllib.parse.urlsplit(url)
+    key = f"{parts.scheme}://{parts.netloc}"
+    with _POOLS_LOCK:
+        pool = _POOLS.get(key)
+        if pool is None:
+            pool = _POOLS[key] = ConnectionPool(key, _pool_size)
+        return pool
+
+
+def _target(url: str) -> str:
+    parts = urllib.parse.urlsplit(url)
+    target = parts.path or "/"
+    if parts.query:
+        target = f"{target}?{parts.query}"
+    return target
+
+
+def request(method: str, url: str, body: Optional[bytes] = None, headers=None, timeout: float = 10.0) -> Response:
+    return pool_for(url).request(method, _target(url), body, headers, timeout)
+
+
+def request_once(method: str, url: str, body: Optional[bytes] = None, headers=None, timeout: float = 10.0) -> Response:
+    """Send one request on a connection of its own, leaving the shared pools untouched (readiness probes)."""
+    pool = ConnectionPool(url, 1)
+    try:
+        return pool.request(method, _target(url), body, headers, timeout)
+    finally:
+        pool.close()
+
+
+def stream(method: str, url: str, body: Optional[bytes] = None, headers=None, timeout: float = 10.0):
+    return pool_for(url).stream(method, _target(url), body, headers, timeout)
+
+
+def close_all() -> None:
+    with _POOLS_LOCK:
+        pools = list(_POOLS.values())
+        _POOLS.clear()
+    for pool in pools:
+        pool.close()
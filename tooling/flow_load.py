@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""Sustained-traffic replay of flow fixtures for the runtime flow evaluator."""
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+from latency_histogram import LatencyHistogram
+from spec_loader import Flow
+
+MAX_SAMPLE_ERRORS = 5
+
+
+@dataclass
+class LoadStats:
+    name: str
+    file: str
+    slo: dict
+    version: str = ""
+    iterations: int = 0
+    total_steps: int = 0
+    failed_steps: int = 0
+    latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+    action_latency: Dict[str, LatencyHistogram] = field(default_factory=dict)
+    step_latency: Dict[Tuple[int, str], LatencyHistogram] = field(default_factory=dict)
+    connect_ms: float = 0.0
+    retries: int = 0
+    hedges: int = 0
+    reconnects: int = 0
+    recovered_steps: int = 0
+    sample_errors: List[str] = field(default_factory=list)
+    max_lag_ms: float = 0.0
+    step_server: Dict[Tuple[int, str], LatencyHistogram] = field(default_factory=dict)
+    step_overhead: Dict[Tuple[int, str], LatencyHistogram] = field(default_factory=dict)
+    step_phases: Dict[Tuple[int, str], Dict[str, float]] = field(default_factory=dict)
+
+    @property
+    def error_rate_pct(self) -> float:
+        return (self.failed_steps / self.total_steps) * 100 if self.total_steps else 0.0
+
+    @property
+    def error_rate_without_retries_pct(self) -> float:
+        """Error rate had no step been retried: steps that only passed after a retry or reconnect count as failed."""
+        failed = self.failed_steps + self.recovered_steps
+        return (failed / self.total_steps) * 100 if self.total_steps else 0.0
+
+    @classmethod
+    def for_flow(cls, flow: Flow) -> "LoadStats":
+        return cls(flow.name, flow.file, flow.slo, flow.version)
+
+    def add(self, result, lag_ms: float = 0.0) -> None:
+        self.iterations += 1
+        self.total_steps += result.total_steps
+        self.failed_steps += result.failed_steps
+        self.retries += result.retries
+        self.hedges += result.hedges
+        self.reconnects += result.reconnects
+        self.recovered_steps += result.recovered_steps
+        self.latency.merge(result.latency)
+        for action, hist in result.action_latency.items():
+            self.action_latency.setdefault(action, LatencyHistogram()).merge(hist)
+        for key, hist in result.step_latency.items():
+            self.step_latency.setdefault(key, LatencyHistogram()).merge(hist)
+        for key, hist in result.step_server.items():
+            self.step_server.setdefault(key, LatencyHistogram()).merge(hist)
+        for key, hist in result.step_overhead.items():
+            self.step_overhead.setdefault(key, LatencyHistogram()).merge(hist)
+        for key, phases in result.step_phases.items():
+            own = self.step_phases.setdefault(key, {})
+            for name, ms in phases.items():
+                own[name] = own.get(name, 0.0) + ms
+        self.connect_ms += result.connect_ms
+        self.max_lag_ms = max(self.max_lag_ms, lag_ms)
+        for err in result.errors:
+            if len(self.sample_errors) >= MAX_SAMPLE_ERRORS:
+                break
+            if err not in self.sample_errors:
+                self.sample_errors.append(err)
+
+
+def run_load(
+    flows: List[Flow],
+    execute: Callable[[Flow], object],
+    duration_sec: Optional[float],
+    iterations: Optional[int],
+    rps: Optional[float],
+    users: int,
+) -> Tuple[List[LoadStats], float]:
+    """Replay flows until the duration elapses or `iterations` suite passes have started.
+
+    Closed loop (rps is None): `users` virtual users each run the next flow as soon as their
+    previous one finishes. Open loop: flow starts are scheduled so that the request rate matches
+    `rps` regardless of response times, with at most `users` flows in flight.
+    """
+    stats = [LoadStats.for_flow(flow) for flow in flows]
+    if not flows:
+        # An empty shard or worker slice has nothing to replay.
+        return stats, 0.0
+    lock = threading.Lock()
+    budget = len(flows) * iterations if iterations else None
+    counter = itertools.count()
+    started = time.perf_counter()
+    deadline = started + duration_sec if duration_sec else None
+
+    def next_item() -> Optional[int]:
+        k = next(counter)
+        if budget is not None and k >= budget:
+            return None
+        if deadline is not None and time.perf_counter() >= deadline:
+            return None
+        return k
+
+    def record(k: int, result, lag_ms: float = 0.0) -> None:
+        with lock:
+            stats[k % len(flows)].add(result, lag_ms)
+
+    def virtual_user() -> None:
+        while True:
+            k = next_item()
+            if k is None:
+                return
+            record(k, execute(flows[k % len(flows)]))
+
+    def scheduled(k: int, due: float) -> None:
+        lag_ms = max(0.0, (time.perf_counter() - due) * 1000)
+        record(k, execute(flows[k % len(flows)]), lag_ms)
+
+    futures = []
+    with ThreadPoolExecutor(max_workers=users) as pool:
+        if rps is None:
+            futures = [pool.submit(virtual_user) for _ in range(users)]
+        else:
+            due = started
+            while True:
+                k = next_item()
+                if k is None:
+                    break
+                if deadline is not None and due >= deadline:
+                    break
+                delay = due - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                futures.append(pool.submit(scheduled, k, due))
+                # Each flow iteration issues one request per step, so space starts by step count.
+                due += max(1, len(flows[k % len(flows)].steps)) / rps
+
+    elapsed = time.perf_counter() - started
+    # Re-raise the first exception of a virtual user instead of losing it with its future.
+    for future in futures:
+        future.result()
+    return stats, elapsed
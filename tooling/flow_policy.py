@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""Request policies declared in flow YAML: timeouts, retries with exponential backoff, and hedged requests.
+
+A flow may set `timeout_ms`, `retry` and `hedge` at the top level as defaults for its steps; a
+step's own keys replace the flow's (`retry: false` / `hedge: false` switch a default off):
+
+    timeout_ms: 2000
+    retry: {attempts: 3, backoff_ms: 50, max_backoff_ms: 1000, on: [timeout, connection, 5xx, 429]}
+    steps:
+      - action: list_todos
+        hedge: {after_ms: 50, max: 1}
+
+Hedges duplicate a request that is still outstanding after `after_ms` and take the first answer,
+so they are only allowed on GET steps without `stream: true`; a flow-level hedge skips other steps.
+"""
+import http.client
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Callable, FrozenSet, Optional, Tuple, Union
+
+DEFAULT_TIMEOUT_MS = 10_000.0
+POLICY_KEYS = ("timeout_ms", "retry", "hedge")
+RETRY_CONDITIONS = frozenset({"timeout", "connection", "5xx"})
+# Threads that run hedged attempts; the caller's thread only waits for the first answer.
+HEDGE_THREADS = 32
+
+_hedge_pool: Optional[ThreadPoolExecutor] = None
+_hedge_pool_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class Retry:
+    attempts: int
+    backoff_ms: float = 50.0
+    max_backoff_ms: float = 1000.0
+    # "timeout", "connection", "5xx" and/or exact status codes.
+    on: FrozenSet[Union[str, int]] = RETRY_CONDITIONS
+
+    def backoff_sec(self, retry: int) -> float:
+        """Delay before the `retry`-th retry: doubles from `backoff_ms`, capped at `max_backoff_ms`."""
+        return min(self.max_backoff_ms, self.backoff_ms * 2 ** (retry - 1)) / 1000.0
+
+    def retries_status(self, status: int) -> bool:
+        return status in self.on or ("5xx" in self.on and 500 <= status <= 599)
+
+    def retries_error(self, error: Exception) -> bool:
+        if isinstance(error, TimeoutError):
+            return "timeout" in self.on
+        return "connection" in self.on and isinstance(error, (ConnectionError, http.client.HTTPException))
+
+
+@dataclass(frozen=True)
+class Hedge:
+    after_ms: float
+    max: int = 1
+
+
+@dataclass(frozen=True)
+class RequestPolicy:
+    timeout_ms: float = DEFAULT_TIMEOUT_MS
+    retry: Optional[Retry] = None
+    hedge: Optional[Hedge] = None
+
+    @property
+    def timeout_sec(self) -> float:
+        return self.timeout_ms / 1000.0
+
+
+DEFAULT_POLICY = RequestPolicy()
+
+
+@dataclass
+class Attempts:
+    """Extra requests a step needed; filled in by `call` even when the step ends in an error.
+
+    `reconnects` counts requests the HTTP client resent after a stale keep-alive connection failed.
+    """
+
+    retries: int = 0
+    hedges: int = 0
+    reconnects: int = 0
+
+
+def _positive(value, where: str) -> float:
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or value <= 0:
+        raise ValueError(f"{where} must be a positive number, got {value!r}")
+    return float(value)
+
+
+def _count(value, where: str) -> int:
+    if isinstance(value, bool) or not isinstance(value, int) or value < 1:
+        raise ValueError(f"{where} must be an integer >= 1, got {value!r}")
+    return value
+
+
+def _retry(raw) -> Optional[Retry]:
+    if raw is None or raw is False:
+        return None
+    if not isinstance(raw, dict):
+        raw = {"attempts": raw}
+    unknown = sorted(set(raw) - {"attempts", "backoff_ms", "max_backoff_ms", "on"})
+    if unknown:
+        raise ValueError(f"retry has unknown keys {unknown}")
+    on = raw.get("on", sorted(RETRY_CONDITIONS))
+    if not isinstance(on, list) or not all(c in RETRY_CONDITIONS or isinstance(c, int) for c in on):
+        raise ValueError(f"retry.on must list timeout, connection, 5xx or status codes, got {on!r}")
+    return Retry(
+        _count(raw.get("attempts"), "retry.attempts"),
+        _positive(raw.get("backoff_ms", 50), "retry.backoff_ms"),
+        _positive(raw.get("max_backoff_ms", 1000), "retry.max_backoff_ms"),
+        frozenset(on),
+    )
+
+
+def _hedge(raw) -> Optional[Hedge]:
+    if raw is None or raw is False:
+        return None
+    if not isinstance(raw, dict):
+        raw = {"after_ms": raw}
+    unknown = sorted(set(raw) - {"after_ms", "max"})
+    if unknown:
+        raise ValueError(f"hedge has unknown keys {unknown}")
+    return Hedge(_positive(raw.get("after_ms"), "hedge.after_ms"), _count(raw.get("max", 1), "hedge.max"))
+
+
+def compile_policy(step: dict, flow: dict, method: Optional[str], stream: bool) -> RequestPolicy:
+    """Combine a step's policy keys with its flow's defaults; raises ValueError on invalid values."""
+    if not any(key in step or key in flow for key in POLICY_KEYS):
+        return DEFAULT_POLICY
+    timeout = step.get("timeout_ms", flow.get("timeout_ms"))
+    hedge = _hedge(step.get("hedge", flow.get("hedge")))
+    if hedge is not None and (method != "GET" or stream):
+        if "hedge" in step:
+            raise ValueError("hedge is only allowed on GET steps without stream: true")
+        hedge = None
+    return RequestPolicy(
+        _positive(timeout, "timeout_ms") if timeout is not None else DEFAULT_TIMEOUT_MS,
+        _retry(step.get("retry", flow.get("retry"))),
+        hedge,
+    )
+
+
+def _race(hedge: Hedge, attempt: Callable[[], Tuple], attempts: Attempts) -> Tuple:
+    """Run `attempt`, starting a duplicate each `after_ms` it is still outstanding; the first answer wins.
+
+    Losing requests are left to finish in the background so their connections return to the pool.
+    """
+    global _hedge_pool
+    with _hedge_pool_lock:
+        if _hedge_pool is None:
+            _hedge_pool = ThreadPoolExecutor(max_workers=HEDGE_THREADS, thread_name_prefix="flow-hedge")
+    futures = [_hedge_pool.submit(attempt)]
+    deadline = time.perf_counter() + hedge.after_ms / 1000.0
+    while True:
+        for future in futures:
+            if future.done() and future.exception() is None:
+                return future.result()
+        pending = [f for f in futures if not f.done()]
+        if not pending:
+            raise futures[0].exception()
+        if len(futures) > hedge.max:
+            wait(pending, return_when=FIRST_COMPLETED)
+            continue
+        remaining = deadline - time.perf_counter()
+        if remaining > 0:
+            wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            continue
+        futures.append(_hedge_pool.submit(attempt))
+        attempts.hedges += 1
+        deadline += hedge.after_ms / 1000.0
+
+
+def call(
+    policy: RequestPolicy, attempt: Callable[[], Tuple], attempts: Attempts, expected_status: Optional[int] = None
+) -> Tuple:
+    """Run `attempt` (returning a tuple that starts with the HTTP status) under `policy`.
+
+    Responses with `expected_status` are never retried. When every attempt fails, the last
+    response is returned or the last error raised.
+    """
+    retry = policy.retry
+    tries = retry.attempts if retry is not None else 1
+    while True:
+        last = attempts.retries + 1 >= tries
+        try:
+            result = _race(policy.hedge, attempt, attempts) if policy.hedge is not None else attempt()
+        except Exception as e:
+            if last or not retry.retries_error(e):
+                raise
+        else:
+            status = result[0]
+            if last or status == expected_status or not retry.retries_status(status):
+                return result
+        attempts.retries += 1
+        time.sleep(retry.backoff_sec(attempts.retries))
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""JSON benchmark reports for runtime flow evaluation and baseline regression checks."""
+import copy
+import datetime
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+from latency_histogram import LatencyHistogram
+from spec_loader import version_key
+
+REPORT_FORMAT = 1
+PERCENTILES = ("p50_ms", "p95_ms", "p99_ms")
+
+
+def _git_commit(root: Path) -> Optional[str]:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=root, capture_output=True, text=True, timeout=5, check=True
+        )
+        return out.stdout.strip() or None
+    except Exception:
+        return None
+
+
+def environment(root: Path, base_url: str, version: str) -> dict:
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "hostname": socket.gethostname(),
+        "git_commit": _git_commit(root),
+        "spec_version": version,
+        "base_url": base_url,
+        "argv": sys.argv[1:],
+    }
+
+
+def flow_entry(stats) -> dict:
+    """Serialize one aggregated flow (see flow_load.LoadStats)."""
+    rate = (stats.failed_steps / stats.total_steps) * 100 if stats.total_steps else 0.0
+    return {
+        "name": stats.name,
+        "file": stats.file,
+        "version": stats.version,
+        "iterations": stats.iterations,
+        "total_steps": stats.total_steps,
+        "failed_steps": stats.failed_steps,
+        "error_rate_pct": rate,
+        "retries": stats.retries,
+        "hedges": stats.hedges,
+        "reconnects": stats.reconnects,
+        "recovered_steps": stats.recovered_steps,
+        "error_rate_without_retries_pct": stats.error_rate_without_retries_pct,
+        "connect_ms": stats.connect_ms,
+        "latency": stats.latency.to_dict(),
+        "actions": {action: hist.to_dict() for action, hist in sorted(stats.action_latency.items())},
+        "steps": [
+            _step_entry(stats, index, action, hist) for (index, action), hist in sorted(stats.step_latency.items())
+        ],
+    }
+
+
+def _step_entry(stats, index: int, action: str, hist) -> dict:
+    entry = {"index": index, "action": action, "latency": hist.to_dict()}
+    key = (index, action)
+    if key in stats.step_server:
+        # Server time from the runtime's Server-Timing header; overhead is client + network time.
+        entry["server"] = stats.step_server[key].to_dict()
+        entry["client_overhead"] = stats.step_overhead[key].to_dict()
+        entry["server_phases_ms"] = dict(sorted(stats.step_phases.get(key, {}).items()))
+    return entry
+
+
+def build_report(
+    stats: list, env: dict, mode: dict, startup_ms: Optional[float], elapsed_sec: float, errors: List[str]
+) -> dict:
+    total_steps = sum(s.total_steps for s in stats)
+    failed_steps = sum(s.failed_steps for s in stats)
+    recovered_steps = sum(s.recovered_steps for s in stats)
+    return {
+        "format": REPORT_FORMAT,
+        "generated_at": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "environment": env,
+        "mode": mode,
+        "startup_ms": startup_ms,
+        "elapsed_sec": elapsed_sec,
+        "total_steps": total_steps,
+        "failed_steps": failed_steps,
+        "error_rate_pct": (failed_steps / total_steps) * 100 if total_steps else 0.0,
+        "retries": sum(s.retries for s in stats),
+        "hedges": sum(s.hedges for s in stats),
+        "reconnects": sum(s.reconnects for s in stats),
+        "recovered_steps": recovered_steps,
+        "error_rate_without_retries_pct": _rate(failed_steps + recovered_steps, total_steps),
+        "passed": not errors,
+        "errors": errors,
+        "flows": [flow_entry(s) for s in stats],
+    }
+
+
+def _rate(failed: int, total: int) -> float:
+    return (failed / total) * 100 if total else 0.0
+
+
+def _merge_latency(a: dict, b: dict) -> dict:
+    return LatencyHistogram.from_dict(a).merge(LatencyHistogram.from_dict(b)).to_dict()
+
+
+def _merge_flow(into: dict, flow: dict) -> None:
+    for key in ("iterations", "total_steps", "failed_steps", "retries", "hedges", "reconnects", "recovered_steps"):
+        into[key] += flow[key]
+    into["connect_ms"] += flow["connect_ms"]
+    into["error_rate_pct"] = _rate(into["failed_steps"], into["total_steps"])
+    into["error_rate_without_retries_pct"] = _rate(into["failed_steps"] + into["recovered_steps"], into["total_steps"])
+    into["latency"] = _merge_latency(into["latency"], flow["latency"])
+    for action, summary in flow["actions"].items():
+        own = into["actions"].get(action)
+        into["actions"][action] = _merge_latency(own, summary) if own else summary
+    steps = {(s["index"], s["action"]): s for s in into["steps"]}
+    for step in flow["steps"]:
+        own = steps.get((step["index"], step["action"]))
+        if own:
+            for key in ("latency", "server", "client_overhead"):
+                if key in step:
+                    own[key] = _merge_latency(own[key], step[key]) if key in own else step[key]
+            phases = own.setdefault("server_phases_ms", {})
+            for name, ms in step.get("server_phases_ms", {}).items():
+                phases[name] = phases.get(name, 0.0) + ms
+        else:
+            into["steps"].append(step)
+    into["steps"].sort(key=lambda s: (s["index"], s["action"]))
+
+
+def merge_reports(reports: List[dict], env: dict, mode: dict, errors: List[str]) -> dict:
+    """Combine per-worker reports into one, as if a single process had run every flow.
+
+    Counts are summed and latency histograms merged bucket by bucket, so aggregate error rates
+    and percentiles are exact rather than averages of per-worker values. Workers run side by
+    side, so startup and elapsed time are the slowest worker's.
+    """
+    flows = {}
+    versions = {}
+    errors = list(errors)
+    for report in reports:
+        errors.extend(report.get("errors", []))
+        for flow in report.get("flows", []):
+            key = (flow.get("version"), flow["name"], flow["file"])
+            if key in flows:
+                _merge_flow(flows[key], flow)
+            else:
+                flows[key] = copy.deepcopy(flow)
+        for row in report.get("versions", []):
+            own = versions.setdefault(row["version"], dict(row, flows=0, total_steps=0, failed_steps=0, errors=0))
+            for field in ("flows", "total_steps", "failed_steps", "errors"):
+                own[field] += row[field]
+            own["elapsed_sec"] = max(own["elapsed_sec"], row["elapsed_sec"])
+    for row in versions.values():
+        row["error_rate_pct"] = (row["failed_steps"] / row["total_steps"]) * 100 if row["total_steps"] else 0.0
+        row["passed"] = row["errors"] == 0
+
+    startups = [r["startup_ms"] for r in reports if r.get("startup_ms") is not None]
+    total_steps = sum(f["total_steps"] for f in flows.values())
+    failed_steps = sum(f["failed_steps"] for f in flows.values())
+    recovered_steps = sum(f["recovered_steps"] for f in flows.values())
+    merged = {
+        "format": REPORT_FORMAT,
+        "generated_at": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "environment": env,
+        "mode": mode,
+        "startup_ms": max(startups) if startups else None,
+        "elapsed_sec": max((r.get("elapsed_sec", 0.0) for r in reports), default=0.0),
+        "total_steps": total_steps,
+        "failed_steps": failed_steps,
+        "error_rate_pct": (failed_steps / total_steps) * 100 if total_steps else 0.0,
+        "retries": sum(f["retries"] for f in flows.values()),
+        "hedges": sum(f["hedges"] for f in flows.values()),
+        "reconnects": sum(f["reconnects"] for f in flows.values()),
+        "recovered_steps": recovered_steps,
+        "error_rate_without_retries_pct": _rate(failed_steps + recovered_steps, total_steps),
+        "passed": not errors,
+        "errors": errors,
+        "flows": sorted(flows.values(), key=lambda f: (f.get("version") or "", f["file"])),
+        "workers": len(reports),
+    }
+    if versions:
+        merged["versions"] = [versions[v] for v in sorted(versions, key=version_key)]
+    return merged
+
+
+def write_report(path: Path, report: dict) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+
+
+def _latency_series(report: dict) -> dict:
+    """Flatten a report into {label: latency summary} for flows, actions, and steps.
+
+    Multi-version reports prefix labels with the spec version, since flow names repeat across versions.
+    """
+    series = {}
+    flows = report.get("flows", [])
+    multi_version = len({flow.get("version") for flow in flows}) > 1
+    for flow in flows:
+        name = f"v{flow['version']}:{flow['name']}" if multi_version else flow["name"]
+        series[name] = flow["latency"]
+        for action, summary in flow.get("actions", {}).items():
+            series[f"{name}:{action}"] = summary
+        for step in flow.get("steps", []):
+            series[f"{name}:step#{step['index']} {step['action']}"] = step["latency"]
+    return series
+
+
+def _regressed(before: float, after: float, tolerance_pct: float, min_delta_ms: float) -> bool:
+    return after > before * (1 + tolerance_pct / 100.0) and after - before > min_delta_ms
+
+
+def _describe(label: str, key: str, before: float, after: float, tolerance_pct: float) -> str:
+    growth = f"+{(after - before) / before * 100:.1f}%" if before else "new"
+    return f"{label}: {key} regressed {before:.1f}ms -> {after:.1f}ms ({growth}, tolerance {tolerance_pct:g}%)"
+
+
+def compare_to_baseline(report: dict, baseline: dict, tolerance_pct: float, min_delta_ms: float) -> List[str]:
+    """Return one message per percentile that regressed past the tolerance relative to the baseline.
+
+    A regression must exceed both `tolerance_pct` of the baseline value and `min_delta_ms` in
+    absolute terms, so sub-millisecond jitter on fast steps does not fail the gate.
+    """
+    regressions = []
+    before, after = baseline.get("startup_ms"), report.get("startup_ms")
+    if before is not None and after is not None and _regressed(before, after, tolerance_pct, min_delta_ms):
+        regressions.append(_describe("runtime", "startup_ms", before, after, tolerance_pct))
+
+    current = _latency_series(report)
+    for label, base in sorted(_latency_series(baseline).items()):
+        now = current.get(label)
+        if now is None:
+            continue
+        for key in PERCENTILES:
+            before, after = base.get(key), now.get(key)
+            if before is None or after is None:
+                continue
+            if _regressed(before, after, tolerance_pct, min_delta_ms):
+                regressions.append(_describe(label, key, before, after, tolerance_pct))
+    return regressions
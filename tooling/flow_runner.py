@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""Execute one flow fixture against a running runtime: requests, expectations and step timing."""
+import json
+import time
+import urllib.parse
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import flow_http
+import flow_policy
+import profiling
+from flow_assertions import StreamingListCheck
+from latency_histogram import LatencyHistogram
+from response_schemas import ResponseSchemas
+from spec_loader import Flow, Step
+
+NDJSON = "application/x-ndjson"
+
+
+def http_request(method: str, url: str, body: Optional[dict] = None, timeout: float = 10.0):
+    """Send one request over the pooled keep-alive client; returns (status, parsed_body, raw_response)."""
+    data = None
+    headers = {"Accept": "application/json"}
+    if body is not None:
+        data = json.dumps(body).encode("utf-8")
+        headers["Content-Type"] = "application/json"
+
+    resp = flow_http.request(method, url, data, headers, timeout=timeout)
+    body_text = resp.body.decode("utf-8")
+
+    parsed = None
+    if body_text:
+        try:
+            parsed = json.loads(body_text)
+        except json.JSONDecodeError:
+            parsed = body_text
+    return resp.status, parsed, resp
+
+
+def http_stream_request(method: str, url: str, body: Optional[dict], check: StreamingListCheck, timeout: float = 10.0):
+    """Request an NDJSON stream and feed each item to `check` as it arrives.
+
+    Returns (status, parsed_body, raw_response, streamed). A runtime that answers with plain JSON
+    instead (for example an error body) is parsed as usual and `streamed` is False.
+    """
+    data = json.dumps(body).encode("utf-8") if body is not None else None
+    headers = {"Accept": f"{NDJSON}, application/json"}
+    if data is not None:
+        headers["Content-Type"] = "application/json"
+
+    with flow_http.stream(method, url, data, headers, timeout=timeout) as resp:
+        streamed = resp.headers.get("content-type", "").startswith(NDJSON)
+        parsed = None
+        if streamed:
+            for line in resp.iter_lines():
+                if line.strip():
+                    check.feed(json.loads(line))
+        else:
+            body_text = resp.read().decode("utf-8")
+            if body_text:
+                try:
+                    parsed = json.loads(body_text)
+                except json.JSONDecodeError:
+                    parsed = body_text
+        raw = flow_http.Response(resp.status, resp.headers, b"", resp.connect_ms, resp.elapsed_ms(), resp.reconnects)
+    return resp.status, parsed, raw, streamed
+
+
+def build_path(step: Step, context: dict) -> str:
+    path = step.path
+    params = step.params
+    if "{id}" in path:
+        if "id_from_previous" in params:
+            key = params["id_from_previous"]
+            if key not in context:
+                raise KeyError(f"missing '{key}' in flow context for path substitution")
+            path = path.replace("{id}", urllib.parse.quote(str(context[key]), safe=""))
+        elif "id" in params:
+            path = path.replace("{id}", urllib.parse.quote(str(params["id"]), safe=""))
+        else:
+            raise KeyError("path requires id param, but none provided")
+
+    query = {k: format_query_value(v) for k, v in step.query.items()}
+    for name, key in step.query_from_previous.items():
+        if key not in context:
+            raise KeyError(f"missing '{key}' in flow context for query parameter '{name}'")
+        query[name] = format_query_value(context[key])
+    if query:
+        path = f"{path}?{urllib.parse.urlencode(query)}"
+    return path
+
+
+def format_query_value(value) -> str:
+    # YAML booleans become the lowercase JSON spelling the runtime expects.
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value)
+
+
+def parse_server_timing(value: str) -> Dict[str, float]:
+    """Parse a `Server-Timing` header into {metric: milliseconds}; entries without `dur` are skipped."""
+    timings: Dict[str, float] = {}
+    for entry in value.split(","):
+        name, _, params = entry.partition(";")
+        for param in params.split(";"):
+            key, _, dur = param.strip().partition("=")
+            if key == "dur":
+                try:
+                    timings[name.strip()] = float(dur.strip('"'))
+                except ValueError:
+                    pass
+    return timings
+
+
+@dataclass
+class FlowResult:
+    name: str
+    lines: List[str] = field(default_factory=list)
+    errors: List[str] = field(default_factory=list)
+    total_steps: int = 0
+    failed_steps: int = 0
+    latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+    action_latency: Dict[str, LatencyHistogram] = field(default_factory=dict)
+    step_latency: Dict[Tuple[int, str], LatencyHistogram] = field(default_factory=dict)
+    connect_ms: float = 0.0
+    # Extra requests from flow retry/hedge policies and client reconnects; recovered steps only
+    # passed after a retry or reconnect.
+    retries: int = 0
+    hedges: int = 0
+    reconnects: int = 0
+    recovered_steps: int = 0
+    # From the runtime's Server-Timing header, when it sends one.
+    step_server: Dict[Tuple[int, str], LatencyHistogram] = field(default_factory=dict)
+    step_overhead: Dict[Tuple[int, str], LatencyHistogram] = field(default_factory=dict)
+    step_phases: Dict[Tuple[int, str], Dict[str, float]] = field(default_factory=dict)
+
+    def record_latency(self, index: int, action: str, ms: float) -> None:
+        self.latency.record(ms)
+        self.action_latency.setdefault(action, LatencyHistogram()).record(ms)
+        self.step_latency.setdefault((index, action), LatencyHistogram()).record(ms)
+
+    def record_attempts(self, attempts: flow_policy.Attempts, failed: bool) -> None:
+        self.retries += attempts.retries
+        self.hedges += attempts.hedges
+        self.reconnects += attempts.reconnects
+        if (attempts.retries or attempts.reconnects) and not failed:
+            self.recovered_steps += 1
+
+    def record_server_timing(self, index: int, action: str, request_ms: float, timings: Dict[str, float]) -> float:
+        """Split a step's request time into server time and client/network overhead; returns server ms."""
+        server_ms = timings.get("total", sum(timings.values()))
+        key = (index, action)
+        self.step_server.setdefault(key, LatencyHistogram()).record(server_ms)
+        self.step_overhead.setdefault(key, LatencyHistogram()).record(max(0.0, request_ms - server_ms))
+        phases = self.step_phases.setdefault(key, {})
+        for name, ms in timings.items():
+            if name != "total":
+                phases[name] = phases.get(name, 0.0) + ms
+        return server_ms
+
+
+def run_flow(flow: Flow, base_url: str, schemas: Optional[ResponseSchemas] = None) -> FlowResult:
+    """Execute one flow with its own context; output is buffered so flows can run concurrently.
+
+    With `schemas`, every response body is also validated against its declared OpenAPI schema.
+    """
+    context = {}
+    result = FlowResult(name=flow.name)
+    result.lines.append(f"RUN: {flow.name} ({flow.file})")
+    with profiling.section(flow.name, "flow"):
+        for step in flow.steps:
+            with profiling.section(f"{flow.name}:step#{step.index} {step.action}", "step"):
+                run_step(flow.name, step, base_url, context, result, schemas)
+    return result
+
+
+def run_step(
+    flow_name: str, step: Step, base_url: str, context: dict, result: FlowResult, schemas: Optional[ResponseSchemas]
+) -> None:
+    """Execute one step, recording its latency, output line and any error in `result`."""
+    errors = result.errors
+    i = step.index
+    action = step.action
+    result.total_steps += 1
+    if step.method is None:
+        result.failed_steps += 1
+        errors.append(f"{flow_name}:step#{i} unknown action '{action}'")
+        return
+
+    method = step.method
+    try:
+        path = build_path(step, context)
+    except Exception as e:
+        result.failed_steps += 1
+        errors.append(f"{flow_name}:step#{i} path build error: {e}")
+        return
+
+    url = f"{base_url}{path}"
+    req_body = step.request
+    expected_status = step.expect_status
+    timeout = step.policy.timeout_sec
+    attempts = flow_policy.Attempts()
+    failed_before = result.failed_steps
+    try:
+        plan = step.assertions
+        item_error = None
+        if step.stream and schemas is not None:
+            declared = schemas.validator(method, step.path, step.expect_status or 200)
+            item_error = declared.item_error if declared is not None and declared.items else None
+
+        def send():
+            # Every attempt streams into a fresh check, so a retried stream starts over.
+            if step.stream:
+                check = plan.streaming(item_error)
+                sent = (*http_stream_request(method, url, req_body, check, timeout), check)
+            else:
+                sent = (*http_request(method, url, req_body, timeout), False, None)
+            attempts.reconnects += sent[2].reconnects
+            return sent
+
+        started = time.perf_counter()
+        status, resp_body, resp, streamed, check = flow_policy.call(step.policy, send, attempts, expected_status)
+        # Step latency is request time on an open connection; TCP setup is reported separately.
+        # After retries or hedges it is the wall time until the accepted response, backoff included.
+        latency_ms = resp.request_ms
+        if attempts.retries or attempts.hedges:
+            latency_ms = (time.perf_counter() - started) * 1000
+        result.record_latency(i, action, latency_ms)
+        result.connect_ms += resp.connect_ms
+        # Cursor-paginated lists advertise the next page in a header; the last page clears it.
+        # Other responses (creates, single gets) leave the cursor of the last list in place.
+        if "x-next-cursor" in resp.headers:
+            context["next_cursor"] = resp.headers["x-next-cursor"]
+        elif streamed or isinstance(resp_body, list):
+            context.pop("next_cursor", None)
+        connect_note = f", connect {resp.connect_ms:.1f} ms" if resp.connect_ms else ""
+        timings = parse_server_timing(resp.headers.get("server-timing", ""))
+        if timings:
+            server_ms = result.record_server_timing(i, action, latency_ms, timings)
+            connect_note += f", server {server_ms:.1f} ms"
+        if attempts.retries:
+            connect_note += f", retries {attempts.retries}"
+        if attempts.hedges:
+            connect_note += f", hedges {attempts.hedges}"
+        if attempts.reconnects:
+            connect_note += f", reconnects {attempts.reconnects}"
+        result.lines.append(f"  STEP {i}: {method} {path} -> {status} ({latency_ms:.1f} ms{connect_note})")
+
+        if expected_status is not None and status != expected_status:
+            result.failed_steps += 1
+            errors.append(
+                f"{flow_name}:step#{i} expected status {expected_status}, got {status} for {method} {path}"
+            )
+            return
+
+        step_latency_slo = step.expect_latency_ms
+        if step_latency_slo is not None and latency_ms > step_latency_slo:
+            result.failed_steps += 1
+            errors.append(
+                f"{flow_name}:step#{i} latency {latency_ms:.1f}ms exceeds expect_latency_ms={step_latency_slo}"
+            )
+            return
+
+        if streamed:
+            check.finish()
+        else:
+            plan.check(resp_body, context)
+            declared = schemas.validator(method, step.path, status) if schemas is not None else None
+            schema_error = declared.error(resp_body) if declared is not None else None
+            if schema_error is not None:
+                raise AssertionError(f"{flow_name}:step#{i} {schema_error}")
+    except TimeoutError:
+        result.failed_steps += 1
+        tries = f" (attempt {attempts.retries + 1})" if attempts.retries else ""
+        errors.append(f"{flow_name}:step#{i} timed out after {step.policy.timeout_ms:g} ms{tries} for {method} {path}")
+    except Exception as e:
+        result.failed_steps += 1
+        errors.append(f"{flow_name}:step#{i} runtime error: {e}")
+    finally:
+        result.record_attempts(attempts, result.failed_steps > failed_before)
@@ -1,27 +1,28 @@
 #!/usr/bin/env python3
 import argparse
-import glob
 import json
-import subprocess
 import sys
 import time
-import urllib.error
-import urllib.parse
-import urllib.request
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, Optional, Tuple
-
-import yaml
+from typing import List, Optional
+
+import flow_http
+import flow_load
+import flow_report
+import flow_shards
+import flow_versions
+import flow_watch
+import profiling
+import runtime_process
+import spec_loader
+from flow_runner import run_flow
+from flow_slo import check_slo
+from response_schemas import ResponseSchemas
+from spec_loader import Flow
 
 ROOT = Path(__file__).resolve().parents[1]
 
-ACTION_MAP = {
-    "health_check": ("GET", "/health"),
-    "create_todo": ("POST", "/todos"),
-    "list_todos": ("GET", "/todos"),
-    "get_todo": ("GET", "/todos/{id}"),
-}
-
 
 def log(msg: str) -> None:
     print(msg)
@@ -31,228 +32,280 @@ def fail(msg: str) -> None:
     print(f"FAIL: {msg}")
 
 
-def load_yaml(p: Path):
-    return yaml.safe_load(p.read_text(encoding="utf-8"))
-
-
 def normalize_base_url(base_url: str) -> str:
     return base_url.rstrip("/")
 
 
-def http_request(method: str, url: str, body: Optional[dict] = None, timeout: float = 10.0):
-    data = None
-    headers = {"Accept": "application/json"}
-    if body is not None:
-        data = json.dumps(body).encode("utf-8")
-        headers["Content-Type"] = "application/json"
-
-    req = urllib.request.Request(url=url, data=data, method=method, headers=headers)
-    try:
-        with urllib.request.urlopen(req, timeout=timeout) as resp:
-            body_text = resp.read().decode("utf-8") if resp.readable() else ""
-            status = resp.status
-    except urllib.error.HTTPError as e:
-        body_text = e.read().decode("utf-8") if e.fp else ""
-        status = e.code
-
-    parsed = None
-    if body_text:
-        try:
-            parsed = json.loads(body_text)
-        except json.JSONDecodeError:
-            parsed = body_text
-    return status, parsed
+def summarize_flows(flows: List[Flow], results, startup_ms: Optional[float], label: str = ""):
+    """Log flow results in flow-file order and check SLOs; returns (errors, per-flow stats)."""
+    errors = []
+    stats = []
+    for flow, result in zip(flows, results):
+        for line in result.lines:
+            log(line)
+        s = flow_load.LoadStats.for_flow(flow)
+        s.add(result)
+        stats.append(s)
+        errors.extend(result.errors)
+        errors.extend(
+            check_slo(
+                s.name, s.slo, s.latency, s.action_latency, s.total_steps, s.failed_steps, startup_ms, s.recovered_steps
+            )
+        )
 
+    if errors:
+        for e in errors:
+            fail(e)
+        return errors, stats
 
-def wait_until_ready(base_url: str, wait_path: str, timeout_sec: int) -> float:
-    deadline = time.time() + timeout_sec
-    url = f"{base_url}{wait_path}"
+    total_steps = sum(s.total_steps for s in stats)
+    failed_steps = sum(s.failed_steps for s in stats)
+    connect_ms = sum(s.connect_ms for s in stats)
+    overall_error_rate = (failed_steps / total_steps) * 100 if total_steps else 0.0
+    log(
+        f"OK: runtime flow evaluation passed{label} ({len(flows)} flow files, {total_steps} steps, "
+        f"error_rate={overall_error_rate:.2f}%, connection_setup={connect_ms:.1f} ms{retry_note(stats)})"
+    )
+    return errors, stats
+
+
+def retry_note(stats) -> str:
+    """Retry/hedge/reconnect counts and the error rate they hid, when any of them kicked in."""
+    retries, hedges, reconnects = (sum(getattr(s, key) for s in stats) for key in ("retries", "hedges", "reconnects"))
+    if not retries and not hedges and not reconnects:
+        return ""
+    total_steps = sum(s.total_steps for s in stats)
+    failed = sum(s.failed_steps + s.recovered_steps for s in stats)
+    rate = (failed / total_steps) * 100 if total_steps else 0.0
+    return f", retries={retries}, hedges={hedges}, reconnects={reconnects}, error_rate_without_retries={rate:.2f}%"
+
+
+def run_flows(
+    base_url: str,
+    flows: List[Flow],
+    startup_ms: Optional[float],
+    concurrency: int = 1,
+    schemas: Optional[ResponseSchemas] = None,
+):
+    """Run every flow once; returns (errors, per-flow stats, elapsed seconds)."""
     started = time.perf_counter()
-    while time.time() < deadline:
-        try:
-            status, _ = http_request("GET", url, None, timeout=2.0)
-            if 200 <= status < 500:
-                ready_ms = (time.perf_counter() - started) * 1000
-                log(f"OK: runtime ready at {url} (status {status}) in {ready_ms:.1f} ms")
-                return ready_ms
-        except Exception:
-            pass
-        time.sleep(1)
-    raise RuntimeError(f"runtime did not become ready within {timeout_sec}s: {url}")
-
-
-def assert_expectations(flow_name: str, step_index: int, expect: dict, resp_body, context: dict):
-    prefix = f"{flow_name}:step#{step_index}"
-    if not expect:
-        return
-
-    if "has_fields" in expect:
-        if not isinstance(resp_body, dict):
-            raise AssertionError(f"{prefix} expected JSON object body for has_fields")
-        for field in expect["has_fields"]:
-            if field not in resp_body:
-                raise AssertionError(f"{prefix} missing expected field '{field}'")
-
-    if "equals" in expect:
-        if not isinstance(resp_body, dict):
-            raise AssertionError(f"{prefix} expected JSON object body for equals")
-        for k, v in expect["equals"].items():
-            if resp_body.get(k) != v:
-                raise AssertionError(f"{prefix} expected body[{k!r}] == {v!r}, got {resp_body.get(k)!r}")
-
-    if "contains" in expect:
-        contains = expect["contains"]
-        if isinstance(resp_body, dict):
-            for k, v in contains.items():
-                actual = resp_body.get(k)
-                if v not in str(actual):
-                    raise AssertionError(f"{prefix} expected body[{k!r}] to contain {v!r}, got {actual!r}")
-        else:
-            raw = str(resp_body)
-            for _, v in contains.items():
-                if v not in raw:
-                    raise AssertionError(f"{prefix} expected response body to contain {v!r}")
-
-    if "length_equals" in expect:
-        if not isinstance(resp_body, list):
-            raise AssertionError(f"{prefix} expected JSON array body for length_equals")
-        if len(resp_body) != int(expect["length_equals"]):
-            raise AssertionError(f"{prefix} expected array length {expect['length_equals']}, got {len(resp_body)}")
-
-    if "length_gte" in expect:
-        if not isinstance(resp_body, list):
-            raise AssertionError(f"{prefix} expected JSON array body for length_gte")
-        if len(resp_body) < int(expect["length_gte"]):
-            raise AssertionError(f"{prefix} expected array length >= {expect['length_gte']}, got {len(resp_body)}")
-
-    if "all_have_fields" in expect:
-        if not isinstance(resp_body, list):
-            raise AssertionError(f"{prefix} expected JSON array body for all_have_fields")
-        fields = expect["all_have_fields"]
-        for idx, item in enumerate(resp_body):
-            if not isinstance(item, dict):
-                raise AssertionError(f"{prefix} expected object at index {idx} in array")
-            for field in fields:
-                if field not in item:
-                    raise AssertionError(f"{prefix} item {idx} missing field '{field}'")
-
-    # Persist common IDs for later steps.
-    if isinstance(resp_body, dict) and "id" in resp_body:
-        context["id"] = resp_body["id"]
-
-
-def build_path(template: str, step: dict, context: dict) -> str:
-    path = template
-    params = step.get("params", {})
-    if "{id}" in path:
-        if "id_from_previous" in params:
-            key = params["id_from_previous"]
-            if key not in context:
-                raise KeyError(f"missing '{key}' in flow context for path substitution")
-            path = path.replace("{id}", urllib.parse.quote(str(context[key]), safe=""))
-        elif "id" in params:
-            path = path.replace("{id}", urllib.parse.quote(str(params["id"]), safe=""))
-        else:
-            raise KeyError("path requires id param, but none provided")
-    return path
-
+    # Each flow owns its context, so independent flow files can run side by side.
+    # Results are consumed in flow-file order to keep output deterministic.
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        results = pool.map(lambda flow: run_flow(flow, base_url, schemas), flows)
+        errors, stats = summarize_flows(flows, results, startup_ms)
+    return errors, stats, time.perf_counter() - started
 
-def run_flows(base_url: str, version: str, startup_ms: Optional[float]) -> int:
-    flow_files = sorted(glob.glob(str(ROOT / f"spec/starter-spec-v{version}/flows/*.yaml")))
-    if not flow_files:
-        fail(f"no flow files found for pinned version {version}")
-        return 1
-
-    errors = []
-    total_steps = 0
-    failed_steps = 0
-
-    for flow_file in flow_files:
-        flow_path = Path(flow_file)
-        flow = load_yaml(flow_path)
-        flow_name = flow.get("name", flow_path.stem)
-        steps = flow.get("steps", [])
-        context = {}
-        flow_latencies = []
-
-        log(f"RUN: {flow_name} ({flow_path.name})")
-        for i, step in enumerate(steps, start=1):
-            total_steps += 1
-            action = step.get("action")
-            if action not in ACTION_MAP:
-                failed_steps += 1
-                errors.append(f"{flow_name}:step#{i} unknown action '{action}'")
-                continue
-
-            method, path_template = ACTION_MAP[action]
-            try:
-                path = build_path(path_template, step, context)
-            except Exception as e:
-                failed_steps += 1
-                errors.append(f"{flow_name}:step#{i} path build error: {e}")
-                continue
 
-            url = f"{base_url}{path}"
-            req_body = step.get("request")
-            expected_status = step.get("expect_status")
+def run_versions(base_url: str, flows_by_version, startup_ms: Optional[float], args, schemas_by_version):
+    """Evaluate several spec versions against one runtime and connection pool.
 
-            try:
-                started = time.perf_counter()
-                status, resp_body = http_request(method, url, req_body)
-                latency_ms = (time.perf_counter() - started) * 1000
-                flow_latencies.append(latency_ms)
-                log(f"  STEP {i}: {method} {path} -> {status} ({latency_ms:.1f} ms)")
-
-                if expected_status is not None and status != int(expected_status):
-                    failed_steps += 1
-                    errors.append(
-                        f"{flow_name}:step#{i} expected status {expected_status}, got {status} for {method} {path}"
-                    )
-                    continue
-
-                step_latency_slo = step.get("expect_latency_ms")
-                if step_latency_slo is not None and latency_ms > float(step_latency_slo):
-                    failed_steps += 1
-                    errors.append(
-                        f"{flow_name}:step#{i} latency {latency_ms:.1f}ms exceeds expect_latency_ms={step_latency_slo}"
-                    )
-                    continue
-
-                assert_expectations(flow_name, i, step.get("expect_body", {}), resp_body, context)
-            except Exception as e:
-                failed_steps += 1
-                errors.append(f"{flow_name}:step#{i} runtime error: {e}")
-
-        slo = flow.get("slo", {}) if isinstance(flow.get("slo"), dict) else {}
-        if slo:
-            if startup_ms is not None and "max_startup_ms" in slo and startup_ms > float(slo["max_startup_ms"]):
-                errors.append(
-                    f"{flow_name}: startup {startup_ms:.1f}ms exceeds max_startup_ms={slo['max_startup_ms']}"
-                )
-            if flow_latencies and "max_step_latency_ms" in slo:
-                worst = max(flow_latencies)
-                if worst > float(slo["max_step_latency_ms"]):
-                    errors.append(
-                        f"{flow_name}: worst step latency {worst:.1f}ms exceeds max_step_latency_ms={slo['max_step_latency_ms']}"
-                    )
-            if total_steps > 0 and "max_error_rate_pct" in slo:
-                rate = (failed_steps / total_steps) * 100
-                if rate > float(slo["max_error_rate_pct"]):
-                    errors.append(
-                        f"{flow_name}: error rate {rate:.2f}% exceeds max_error_rate_pct={slo['max_error_rate_pct']}"
-                    )
+    Every version keeps its own flows, contexts and stats; single runs execute the versions side
+    by side, load replays run them one after another so each gets the full traffic budget.
+    Returns (errors, per-flow stats, elapsed seconds, per-version results).
+    """
+    started = time.perf_counter()
+    versions = list(flows_by_version)
+
+    def execute(version: str):
+        began = time.perf_counter()
+        flows = flows_by_version[version]
+        with ThreadPoolExecutor(max_workers=max(1, args.concurrency)) as pool:
+            results = list(pool.map(lambda flow: run_flow(flow, base_url, schemas_by_version[version]), flows))
+        return results, time.perf_counter() - began
+
+    runs = {}
+    if not args.load:
+        with ThreadPoolExecutor(max_workers=len(versions)) as pool:
+            runs = dict(zip(versions, pool.map(execute, versions)))
+
+    errors: List[str] = []
+    stats: list = []
+    matrix = []
+    for version in versions:
+        flows = flows_by_version[version]
+        log(f"RUN: spec v{version}")
+        if not spec_loader.flow_files(version):
+            errs, version_stats, elapsed = [f"no flow files found for spec version {version}"], [], 0.0
+            fail(errs[0])
+        elif args.load:
+            schemas = schemas_by_version[version]
+            errs, version_stats, elapsed = run_load_mode(base_url, flows, startup_ms, args, schemas)
+        else:
+            results, elapsed = runs[version]
+            errs, version_stats = summarize_flows(flows, results, startup_ms, f" for spec v{version}")
+        errors.extend(flow_versions.prefixed(version, errs))
+        stats.extend(version_stats)
+        matrix.append(
+            flow_versions.VersionResult(
+                version,
+                len(flows),
+                sum(s.total_steps for s in version_stats),
+                sum(s.failed_steps for s in version_stats),
+                errs,
+                elapsed,
+            )
+        )
+    for line in flow_versions.format_matrix([row.to_dict() for row in matrix]):
+        log(line)
+    return errors, stats, time.perf_counter() - started, matrix
+
+
+def run_load_mode(
+    base_url: str, flows: List[Flow], startup_ms: Optional[float], args, schemas: Optional[ResponseSchemas] = None
+):
+    """Replay flows under sustained traffic; returns (errors, per-flow stats, elapsed seconds)."""
+    mode = f"open-loop {args.rps:g} req/s" if args.rps else f"closed-loop {args.concurrency} users"
+    limit = f"{args.duration_sec:g}s" if args.duration_sec else f"{args.iterations} iterations"
+    log(f"RUN: load replay of {len(flows)} flow files ({mode}, {limit})")
+    stats, elapsed = flow_load.run_load(
+        flows,
+        lambda flow: run_flow(flow, base_url, schemas),
+        args.duration_sec,
+        args.iterations,
+        args.rps,
+        args.concurrency,
+    )
 
+    errors = []
+    total_requests = 0
+    for s in stats:
+        total_requests += s.total_steps
+        rate = (s.failed_steps / s.total_steps) * 100 if s.total_steps else 0.0
+        log(
+            f"  FLOW {s.name}: {s.iterations} iterations, {s.total_steps} steps, error_rate={rate:.2f}%, "
+            f"{s.latency.summary()}, max_schedule_lag={s.max_lag_ms:.1f} ms{retry_note([s])}"
+        )
+        for action in sorted(s.action_latency):
+            log(f"    ACTION {action}: {s.action_latency[action].summary()}")
+        for index, action in sorted(s.step_server):
+            server, overhead = s.step_server[(index, action)], s.step_overhead[(index, action)]
+            log(
+                f"    STEP {index} {action}: server p50={server.percentile(50):.2f} "
+                f"p95={server.percentile(95):.2f} ms, client overhead p50={overhead.percentile(50):.2f} "
+                f"p95={overhead.percentile(95):.2f} ms"
+            )
+        errors.extend(
+            check_slo(
+                s.name, s.slo, s.latency, s.action_latency, s.total_steps, s.failed_steps, startup_ms, s.recovered_steps
+            )
+        )
+        # Without an error-rate budget any failed step fails the gate, as in a single run.
+        if s.failed_steps and "max_error_rate_pct" not in s.slo:
+            errors.append(f"{s.name}: {s.failed_steps} failed steps under load")
+        if s.failed_steps:
+            errors.extend(f"{s.name}: sample error: {e}" for e in s.sample_errors)
+
+    achieved = total_requests / elapsed if elapsed > 0 else 0.0
     if errors:
         for e in errors:
             fail(e)
-        return 1
-
-    overall_error_rate = (failed_steps / total_steps) * 100 if total_steps else 0.0
-    log(
-        f"OK: runtime flow evaluation passed ({len(flow_files)} flow files, {total_steps} steps, "
-        f"error_rate={overall_error_rate:.2f}%)"
-    )
-    return 0
+        return errors, stats, elapsed
+    log(f"OK: load replay passed ({total_requests} requests in {elapsed:.1f}s, {achieved:.1f} req/s)")
+    return errors, stats, elapsed
+
+
+def run_mode(args) -> dict:
+    mode = {
+        "load": args.load,
+        "concurrency": args.concurrency,
+        "pool_size": args.pool_size,
+        "validate_schemas": args.validate_schemas,
+        "shard": args.shard or None,
+        "workers": args.workers,
+    }
+    if args.load:
+        mode.update({"duration_sec": args.duration_sec, "iterations": args.iterations, "rps": args.rps})
+    return mode
+
+
+def finish_run(
+    args, base_url: str, version: str, startup_ms: Optional[float], errors, stats, elapsed, matrix=None
+) -> int:
+    env = flow_report.environment(ROOT, base_url, version)
+    report = flow_report.build_report(stats, env, run_mode(args), startup_ms, elapsed, errors)
+    if matrix is not None:
+        report["versions"] = [row.to_dict() for row in matrix]
+    if profiling.ACTIVE is not None:
+        report["profile"] = write_profile(args)
+    return publish_report(args, report)
+
+
+def write_profile(args) -> dict:
+    """Write the collected profile next to the report and log the busiest sections."""
+    profiler = profiling.ACTIVE
+    files = profiler.write(profiling.output_prefix(args.profile_out, args.report, "runtime-eval-profile"))
+    if files:
+        extra = f" (+{len(files) - 1} per-{profiler.scope} files)" if len(files) > 1 else ""
+        log(f"OK: wrote {profiler.mode} profile to {files[0]}{extra}")
+    for line in profiler.hottest():
+        log(f"  PROFILE {line}")
+    return {"mode": profiler.mode, "scope": profiler.scope, "files": [str(p) for p in files]}
+
+
+def publish_report(args, report: dict) -> int:
+    """Write the optional JSON report and apply the optional baseline regression gate."""
+    if args.report:
+        flow_report.write_report(Path(args.report), report)
+        log(f"OK: wrote benchmark report to {args.report}")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        regressions = flow_report.compare_to_baseline(
+            report, baseline, args.regression_tolerance_pct, args.regression_min_delta_ms
+        )
+        for r in regressions:
+            fail(f"performance regression vs {args.baseline}: {r}")
+        if regressions:
+            return 1
+        log(f"OK: no percentile regressions vs {args.baseline} (tolerance {args.regression_tolerance_pct:g}%)")
+    return 0 if report["passed"] else 1
+
+
+def run_worker_pool(args, versions: List[str], shard) -> int:
+    """Fan the (sharded) flow list out to `--workers` processes and merge their reports."""
+    log(f"RUN: {args.workers} worker processes for shard {shard[0]}/{shard[1]}")
+    reports, errors = flow_shards.run_workers(Path(__file__), sys.argv[1:], args, shard, log)
+    env = flow_report.environment(ROOT, normalize_base_url(args.base_url), ",".join(versions))
+    report = flow_report.merge_reports(reports, env, run_mode(args), errors)
+    if args.profile:
+        files = [path for r in reports for path in r.get("profile", {}).get("files", [])]
+        report["profile"] = {"mode": args.profile, "scope": args.profile_scope, "files": files}
+    if report["errors"]:
+        for e in report["errors"]:
+            fail(e)
+    else:
+        log(
+            f"OK: {len(reports)} workers passed ({len(report['flows'])} flow files, {report['total_steps']} steps, "
+            f"error_rate={report['error_rate_pct']:.2f}%)"
+        )
+    if len(report.get("versions", [])) > 1:
+        for line in flow_versions.format_matrix(report["versions"]):
+            log(line)
+    return publish_report(args, report)
+
+
+def start_runtime(args, base_url: str):
+    """Start `--start-cmd` and wait until it is ready; returns (runtime, startup ms) or raises RuntimeError."""
+    log(f"RUN: starting runtime with command: {args.start_cmd}")
+    if args.ready_file:
+        Path(args.ready_file).unlink(missing_ok=True)
+    runtime = runtime_process.RuntimeProcess(args.start_cmd, ROOT, args.ready_log_pattern or None)
+    try:
+        startup_ms = runtime_process.wait_until_ready(
+            base_url,
+            args.wait_path,
+            args.wait_timeout_sec,
+            runtime,
+            args.ready_file,
+            args.wait_initial_interval_ms,
+            args.wait_max_interval_ms,
+            log,
+        )
+    except RuntimeError:
+        runtime.stop()
+        raise
+    return runtime, startup_ms
 
 
 def main() -> int:
@@ -260,27 +313,182 @@ def main() -> int:
     parser.add_argument("--base-url", default="http://127.0.0.1:3000", help="Base URL for runtime under test")
     parser.add_argument("--start-cmd", default="", help="Optional command to start runtime before evaluation")
     parser.add_argument("--wait-path", default="/health", help="Path checked for readiness")
-    parser.add_argument("--wait-timeout-sec", type=int, default=60, help="Readiness wait timeout")
+    parser.add_argument("--wait-timeout-sec", type=float, default=60, help="Readiness wait timeout")
+    parser.add_argument(
+        "--wait-initial-interval-ms",
+        type=float,
+        default=runtime_process.DEFAULT_INITIAL_INTERVAL_MS,
+        help="First readiness probe interval; later probes back off exponentially",
+    )
+    parser.add_argument(
+        "--wait-max-interval-ms",
+        type=float,
+        default=runtime_process.DEFAULT_MAX_INTERVAL_MS,
+        help="Upper bound for the readiness probe interval",
+    )
+    parser.add_argument(
+        "--ready-log-pattern", default="", help="Regex; a matching output line of --start-cmd also signals readiness"
+    )
+    parser.add_argument("--ready-file", default="", help="File whose appearance also signals readiness")
+    parser.add_argument(
+        "--concurrency", type=int, default=1, help="Number of flow files executed at the same time (default: serial)"
+    )
+    parser.add_argument(
+        "--pool-size",
+        type=int,
+        default=None,
+        help="Idle keep-alive connections kept per base URL (default: max(4, --concurrency)); never limits requests",
+    )
+    parser.add_argument("--load", action="store_true", help="Replay flows as virtual users and judge SLOs in aggregate")
+    parser.add_argument("--duration-sec", type=float, default=None, help="Load mode: replay for this many seconds")
+    parser.add_argument("--iterations", type=int, default=None, help="Load mode: number of full passes over all flows")
+    parser.add_argument(
+        "--rps", type=float, default=None, help="Load mode: open-loop target request rate (default: closed loop)"
+    )
+    parser.add_argument(
+        "--versions",
+        default="",
+        help="Comma-separated spec versions to evaluate in one run, or 'all' (default: spec/VERSION)",
+    )
+    parser.add_argument(
+        "--validate-schemas",
+        action="store_true",
+        help="Validate every response body against the schema api/openapi.yaml declares for its status",
+    )
+    parser.add_argument(
+        "--shard", default="", help="Run only shard i of n (1-based) of the sorted flow-file list, e.g. 2/4"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Split the flows across this many evaluator processes and merge their reports; "
+        "{port} in --base-url/--start-cmd gives each worker its own runtime",
+    )
+    parser.add_argument(
+        "--profile",
+        choices=profiling.MODES,
+        default="",
+        help="Profile the evaluator: deterministic cProfile (pstats) or low-overhead stack sampling (collapsed stacks)",
+    )
+    parser.add_argument(
+        "--profile-scope", choices=("flow", "step"), default="flow", help="Attribute profile data per flow or per step"
+    )
+    parser.add_argument(
+        "--profile-out", default="", help="Path prefix for --profile output (default: next to --report)"
+    )
+    parser.add_argument("--report", default="", help="Write a JSON benchmark report to this path")
+    parser.add_argument("--baseline", default="", help="Fail if percentiles regress against this JSON report")
+    parser.add_argument(
+        "--regression-tolerance-pct",
+        type=float,
+        default=10.0,
+        help="Allowed percentile increase over --baseline before failing (default: 10%%)",
+    )
+    parser.add_argument(
+        "--regression-min-delta-ms",
+        type=float,
+        default=1.0,
+        help="Ignore percentile increases smaller than this many milliseconds (default: 1.0)",
+    )
+    flow_watch.add_arguments(parser)
     args = parser.parse_args()
-
-    version = (ROOT / "spec/VERSION").read_text(encoding="utf-8").strip()
+    if args.load and not (args.duration_sec or args.iterations):
+        parser.error("--load requires --duration-sec or --iterations")
+    if args.rps is not None and args.rps <= 0:
+        parser.error("--rps must be > 0")
+    if args.concurrency < 1:
+        parser.error("--concurrency must be >= 1")
+    if args.pool_size is None:
+        args.pool_size = max(flow_http.DEFAULT_POOL_SIZE, args.concurrency)
+    elif args.pool_size < 1:
+        parser.error("--pool-size must be >= 1")
+    if args.workers < 1:
+        parser.error("--workers must be >= 1")
+    if args.watch and (args.load or args.workers > 1 or args.shard):
+        parser.error("--watch cannot be combined with --load, --workers or --shard")
+    try:
+        versions = spec_loader.resolve_versions(args.versions)
+        shard = flow_shards.parse_shard(args.shard) if args.shard else (1, 1)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.workers > 1:
+        args.workers = flow_shards.cap_workers(args.workers, versions, shard)
+    if args.workers > 1:
+        return run_worker_pool(args, versions, shard)
+    if args.profile:
+        profiling.configure(args.profile, args.profile_scope)
+    if flow_shards.uses_port_template(args.base_url, args.start_cmd):
+        port = flow_shards.free_port()
+        args.base_url = flow_shards.fill_port(args.base_url, port)
+        args.start_cmd = flow_shards.fill_port(args.start_cmd, port)
+    flow_http.configure(args.pool_size)
     base_url = normalize_base_url(args.base_url)
 
-    proc = None
+    runtime = None
     startup_ms = None
     try:
         if args.start_cmd:
-            log(f"RUN: starting runtime with command: {args.start_cmd}")
-            proc = subprocess.Popen(args.start_cmd, shell=True, cwd=ROOT)
-            startup_ms = wait_until_ready(base_url, args.wait_path, args.wait_timeout_sec)
-        return run_flows(base_url, version, startup_ms)
-    finally:
-        if proc is not None:
-            proc.terminate()
             try:
-                proc.wait(timeout=10)
-            except subprocess.TimeoutExpired:
-                proc.kill()
+                runtime, startup_ms = start_runtime(args, base_url)
+            except RuntimeError as e:
+                fail(str(e))
+                return 1
+        try:
+            flows_by_version = {v: spec_loader.load_flows(v) for v in versions}
+        except ValueError as e:
+            fail(f"invalid flow fixture: {e}")
+            return 1
+        if len(versions) == 1 and not flows_by_version[versions[0]]:
+            fail(f"no flow files found for pinned version {versions[0]}")
+            return 1
+        if args.shard:
+            flows_by_version = flow_shards.select(flows_by_version, *shard)
+            log(f"RUN: shard {args.shard}: {sum(map(len, flows_by_version.values()))} flow files")
+        schemas_by_version = {v: None for v in versions}
+        if args.validate_schemas:
+            api = spec_loader.load_api()
+            try:
+                for v in versions:
+                    schemas_by_version[v] = ResponseSchemas(api, spec_loader.load_schemas(v))
+                    compiled = schemas_by_version[v].compile_all()
+            except ValueError as e:
+                fail(f"cannot compile response schemas: {e}")
+                return 1
+            log(f"OK: compiled {compiled} response schemas for validation")
+        if len(versions) > 1:
+            errors, stats, elapsed, matrix = run_versions(
+                base_url, flows_by_version, startup_ms, args, schemas_by_version
+            )
+            rc = finish_run(args, base_url, ",".join(versions), startup_ms, errors, stats, elapsed, matrix)
+        else:
+            version = versions[0]
+            flows = flows_by_version[version]
+            schemas = schemas_by_version[version]
+            if args.load:
+                errors, stats, elapsed = run_load_mode(base_url, flows, startup_ms, args, schemas)
+            else:
+                errors, stats, elapsed = run_flows(base_url, flows, startup_ms, args.concurrency, schemas)
+            rc = finish_run(args, base_url, version, startup_ms, errors, stats, elapsed)
+        if not args.watch:
+            return rc
+        watcher = flow_watch.Watcher(
+            args,
+            base_url,
+            flows_by_version,
+            schemas_by_version,
+            runtime,
+            startup_ms,
+            lambda: start_runtime(args, base_url),
+            summarize_flows,
+            log,
+            fail,
+        )
+        return watcher.run(rc)
+    finally:
+        flow_http.close_all()
+        if runtime is not None:
+            runtime.stop()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""Sharding of flow suites across CI machines (`--shard i/n`) and local worker processes (`--workers N`)."""
+import json
+import socket
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import profiling
+import spec_loader
+
+# Options the parent rewrites for each worker; values are dropped together with the flag.
+WORKER_OVERRIDES = (
+    "--shard", "--workers", "--report", "--baseline", "--base-url", "--start-cmd", "--ready-file", "--profile-out"
+)
+
+
+def parse_shard(value: str) -> Tuple[int, int]:
+    """Parse `i/n` (1-based) into (index, count)."""
+    try:
+        index, count = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise ValueError(f"--shard must look like i/n, got {value!r}") from None
+    if count < 1 or not 1 <= index <= count:
+        raise ValueError(f"--shard index must be within 1..{count}, got {value!r}")
+    return index, count
+
+
+def select(flows_by_version: Dict[str, list], index: int, count: int) -> Dict[str, list]:
+    """Keep every `count`-th flow of the sorted (version, flow file) list, starting at `index`.
+
+    Versions and flow files are both loaded in sorted order, so every machine computes the same
+    split without coordination.
+    """
+    selected: Dict[str, list] = {version: [] for version in flows_by_version}
+    position = 0
+    for version, flows in flows_by_version.items():
+        for flow in flows:
+            if position % count == index - 1:
+                selected[version].append(flow)
+            position += 1
+    return selected
+
+
+def cap_workers(workers: int, versions: List[str], shard: Tuple[int, int]) -> int:
+    """At most one worker per flow file of the shard, so no worker gets an empty slice."""
+    try:
+        flows = select({version: spec_loader.load_flows(version) for version in versions}, *shard)
+    except ValueError:
+        # Let the workers report the invalid fixture.
+        return workers
+    return max(1, min(workers, sum(map(len, flows.values()))))
+
+
+def free_port(host: str = "127.0.0.1") -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind((host, 0))
+        return s.getsockname()[1]
+
+
+def fill_port(template: str, port: Optional[int]) -> str:
+    return template.replace("{port}", str(port)) if port is not None and template else template
+
+
+def uses_port_template(*templates: str) -> bool:
+    return any("{port}" in t for t in templates if t)
+
+
+def _strip_options(argv: List[str], names) -> List[str]:
+    out: List[str] = []
+    skip = False
+    for arg in argv:
+        if skip:
+            skip = False
+            continue
+        name = arg.split("=", 1)[0]
+        if name in names:
+            skip = "=" not in arg
+            continue
+        out.append(arg)
+    return out
+
+
+def worker_argv(script: Path, argv: List[str], worker: int, workers: int, shard: Tuple[int, int], args, port) -> list:
+    """Command line for one worker: the parent's options plus its own sub-shard, runtime and report.
+
+    Worker k of N inside shard i/n takes shard (i-1)*N+k of n*N, so machines and workers compose.
+    """
+    index, count = shard
+    cmd = [sys.executable, str(script)] + _strip_options(argv, WORKER_OVERRIDES)
+    cmd += ["--shard", f"{(index - 1) * workers + worker}/{count * workers}", "--workers", "1"]
+    cmd += ["--base-url", fill_port(args.base_url, port)]
+    if args.start_cmd:
+        cmd += ["--start-cmd", fill_port(args.start_cmd, port)]
+    if args.ready_file:
+        cmd += ["--ready-file", f"{args.ready_file}.w{worker}"]
+    if args.profile:
+        prefix = profiling.output_prefix(args.profile_out, args.report, "runtime-eval-profile")
+        cmd += ["--profile-out", f"{prefix}.w{worker}"]
+    return cmd
+
+
+def run_workers(script: Path, argv: List[str], args, shard: Tuple[int, int], log=print) -> Tuple[List[dict], List[str]]:
+    """Run `args.workers` evaluator processes side by side; returns (worker reports, errors).
+
+    Each worker starts its own runtime when `--start-cmd` / `--base-url` contain `{port}`.
+    Worker output is relayed, prefixed with the worker number, once the worker exits.
+    """
+    templated = uses_port_template(args.base_url, args.start_cmd)
+    reports: List[dict] = []
+    errors: List[str] = []
+    with tempfile.TemporaryDirectory(prefix="flow-workers-") as tmp:
+        procs = []
+        ports = set()
+        for worker in range(1, args.workers + 1):
+            port = None
+            while templated and (port is None or port in ports):
+                port = free_port()
+            ports.add(port)
+            report_path = Path(tmp) / f"worker-{worker}.json"
+            cmd = worker_argv(script, argv, worker, args.workers, shard, args, port)
+            cmd += ["--report", str(report_path)]
+            proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+            procs.append((worker, proc, report_path))
+        for worker, proc, report_path in procs:
+            output, _ = proc.communicate()
+            for line in output.splitlines():
+                log(f"[w{worker}] {line}")
+            if report_path.exists():
+                reports.append(json.loads(report_path.read_text(encoding="utf-8")))
+            else:
+                errors.append(f"worker {worker} exited with code {proc.returncode} without a report")
+    return reports, errors
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""Evaluation of flow `slo` blocks against recorded step outcomes."""
+from typing import Dict, List, Optional
+
+from latency_histogram import LatencyHistogram
+
+# Percentile limits accepted in a flow `slo` block, and under `slo.actions.<action>` overrides.
+PERCENTILE_KEYS = {"p50_ms": 50, "p95_ms": 95, "p99_ms": 99}
+
+
+def _check_percentiles(label: str, limits: dict, hist: LatencyHistogram) -> List[str]:
+    errors = []
+    for key, pct in PERCENTILE_KEYS.items():
+        if key not in limits or not hist.count:
+            continue
+        value = hist.percentile(pct)
+        if value > float(limits[key]):
+            errors.append(f"{label}: p{pct} latency {value:.1f}ms exceeds {key}={limits[key]} (n={hist.count})")
+    return errors
+
+
+def check_slo(
+    flow_name: str,
+    slo,
+    hist: LatencyHistogram,
+    action_hists: Dict[str, LatencyHistogram],
+    total_steps: int,
+    failed_steps: int,
+    startup_ms: Optional[float],
+    recovered_steps: int = 0,
+) -> List[str]:
+    """`recovered_steps` passed only after a retry; `max_error_rate_without_retries_pct` counts them as failed."""
+    errors = []
+    if not isinstance(slo, dict) or not slo:
+        return errors
+    if startup_ms is not None and "max_startup_ms" in slo and startup_ms > float(slo["max_startup_ms"]):
+        errors.append(f"{flow_name}: startup {startup_ms:.1f}ms exceeds max_startup_ms={slo['max_startup_ms']}")
+    if hist.count and "max_step_latency_ms" in slo:
+        worst = hist.max_ms
+        if worst > float(slo["max_step_latency_ms"]):
+            errors.append(
+                f"{flow_name}: worst step latency {worst:.1f}ms exceeds max_step_latency_ms={slo['max_step_latency_ms']}"
+            )
+    if total_steps > 0 and "max_error_rate_pct" in slo:
+        rate = (failed_steps / total_steps) * 100
+        if rate > float(slo["max_error_rate_pct"]):
+            errors.append(f"{flow_name}: error rate {rate:.2f}% exceeds max_error_rate_pct={slo['max_error_rate_pct']}")
+    if total_steps > 0 and "max_error_rate_without_retries_pct" in slo:
+        limit = slo["max_error_rate_without_retries_pct"]
+        rate = ((failed_steps + recovered_steps) / total_steps) * 100
+        if rate > float(limit):
+            errors.append(
+                f"{flow_name}: error rate without retries {rate:.2f}% "
+                f"exceeds max_error_rate_without_retries_pct={limit}"
+            )
+
+    # Percentile limits apply to the whole flow and to each action in it; an action may override them.
+    errors.extend(_check_percentiles(flow_name, slo, hist))
+    overrides = slo.get("actions") if isinstance(slo.get("actions"), dict) else {}
+    for action in sorted(action_hists):
+        limits = {k: v for k, v in slo.items() if k in PERCENTILE_KEYS}
+        limits.update(overrides.get(action) or {})
+        errors.extend(_check_percentiles(f"{flow_name}:{action}", limits, action_hists[action]))
+    return errors
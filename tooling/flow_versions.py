@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""Compatibility matrix for evaluating several spec versions in one run."""
+from dataclasses import dataclass, field
+from typing import List
+
+
+@dataclass
+class VersionResult:
+    version: str
+    flows: int
+    total_steps: int = 0
+    failed_steps: int = 0
+    errors: List[str] = field(default_factory=list)
+    elapsed_sec: float = 0.0
+
+    @property
+    def passed(self) -> bool:
+        return not self.errors
+
+    @property
+    def error_rate_pct(self) -> float:
+        return (self.failed_steps / self.total_steps) * 100 if self.total_steps else 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "version": self.version,
+            "flows": self.flows,
+            "total_steps": self.total_steps,
+            "failed_steps": self.failed_steps,
+            "error_rate_pct": self.error_rate_pct,
+            "elapsed_sec": self.elapsed_sec,
+            "passed": self.passed,
+            "errors": len(self.errors),
+        }
+
+
+def prefixed(version: str, errors: List[str]) -> List[str]:
+    """Tag errors with their spec version so identically named flows stay distinguishable."""
+    return [f"v{version} {e}" for e in errors]
+
+
+def format_matrix(rows: List[dict]) -> List[str]:
+    """Render VersionResult.to_dict() rows (also the report's `versions` entries) as a table."""
+    header = f"  {'version':<10} {'flows':>5} {'steps':>6} {'failed':>6} {'error_rate':>10} {'elapsed_ms':>10}  result"
+    lines = ["COMPATIBILITY MATRIX", header]
+    for r in rows:
+        lines.append(
+            f"  {'v' + r['version']:<10} {r['flows']:>5} {r['total_steps']:>6} {r['failed_steps']:>6} "
+            f"{r['error_rate_pct']:>9.2f}% {r['elapsed_sec'] * 1000:>10.1f}  {'PASS' if r['passed'] else 'FAIL'}"
+        )
+    return lines
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""`--watch` mode for flow_runtime_eval: re-run only the flows a change affects, against a warm runtime.
+
+Watched files are polled by mtime and size, which costs one `stat` per file per interval:
+
+- a changed or added flow file re-runs that flow;
+- `api/openapi.yaml` re-runs the flows whose operations changed, or every flow when shared
+  definitions (components, servers, ...) changed;
+- a pinned schema file re-runs the version's flows when `--validate-schemas` is on;
+- runtime source (`--watch-runtime`) restarts the runtime when it was started with `--start-cmd`,
+  then re-runs every flow.
+
+The runtime process and the connection pool stay up between runs.
+"""
+import glob
+import hashlib
+import json
+import os
+import stat
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+import yaml
+
+import flow_http
+import spec_loader
+from contract_coverage import operation_digests
+from flow_runner import run_flow
+from response_schemas import ResponseSchemas
+from spec_loader import ROOT, ApiSpec, Flow
+
+DEFAULT_INTERVAL_MS = 200.0
+# Editors often save in several writes; a change is acted on once files stop changing for this long.
+SETTLE_MS = 50.0
+DEFAULT_RUNTIME_GLOBS = ("src/**", "tooling/fixture_*.py")
+API_FILE = str(ROOT / "api/openapi.yaml")
+
+# path -> (mtime_ns, size)
+Snapshot = Dict[str, Tuple[int, int]]
+
+
+def add_arguments(parser) -> None:
+    parser.add_argument(
+        "--watch", action="store_true", help="Keep running and re-run the flows affected by each spec or runtime change"
+    )
+    parser.add_argument(
+        "--watch-runtime",
+        action="append",
+        default=[],
+        metavar="GLOB",
+        help=f"Runtime source to watch, relative to the repo (repeatable; default: {' '.join(DEFAULT_RUNTIME_GLOBS)})",
+    )
+    parser.add_argument(
+        "--watch-interval-ms", type=float, default=DEFAULT_INTERVAL_MS, help="Polling interval for --watch"
+    )
+
+
+def snapshot(patterns: List[str]) -> Snapshot:
+    files: Snapshot = {}
+    for pattern in patterns:
+        for path in glob.glob(str(ROOT / pattern), recursive=True):
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            if stat.S_ISREG(st.st_mode):
+                files[path] = (st.st_mtime_ns, st.st_size)
+    return files
+
+
+def changed_files(before: Snapshot, after: Snapshot) -> Set[str]:
+    return {path for path in before.keys() | after.keys() if before.get(path) != after.get(path)}
+
+
+def api_digests(api: ApiSpec) -> Tuple[str, Dict[str, str]]:
+    """Digest of everything outside `paths`, plus one digest per operation."""
+    shared = {key: value for key, value in api.raw.items() if key != "paths"}
+    return hashlib.sha256(json.dumps(shared, sort_keys=True, default=str).encode()).hexdigest(), operation_digests(api)
+
+
+def operations_of(flow: Flow) -> Set[str]:
+    return {f"{step.method} {step.path}" for step in flow.steps if step.method is not None}
+
+
+class Watcher:
+    def __init__(
+        self,
+        args,
+        base_url: str,
+        flows_by_version: Dict[str, List[Flow]],
+        schemas_by_version: Dict[str, Optional[ResponseSchemas]],
+        runtime,
+        startup_ms: Optional[float],
+        start_runtime: Callable[[], Tuple[object, Optional[float]]],
+        summarize: Callable,
+        log: Callable[[str], None],
+        fail: Callable[[str], None],
+    ):
+        self.args = args
+        self.base_url = base_url
+        self.flows_by_version = flows_by_version
+        self.runtime = self.initial_runtime = runtime
+        self.startup_ms = startup_ms
+        self.start_runtime = start_runtime
+        self.summarize = summarize
+        self.log = log
+        self.fail = fail
+        self.api = spec_loader.load_api()
+        self.digests = api_digests(self.api)
+        self.schemas = dict(schemas_by_version)
+        self.runtime_globs = list(args.watch_runtime or DEFAULT_RUNTIME_GLOBS)
+        self.flow_dirs = {str(ROOT / f"spec/starter-spec-v{v}/flows"): v for v in flows_by_version}
+        self.schema_dirs = {str(ROOT / f"spec/starter-spec-v{v}/schemas"): v for v in flows_by_version}
+        self.patterns = [
+            "api/openapi.yaml",
+            *(f"spec/starter-spec-v{v}/flows/*.yaml" for v in flows_by_version),
+            *(f"spec/starter-spec-v{v}/schemas/*.schema.json" for v in flows_by_version),
+            *self.runtime_globs,
+        ]
+
+    def _load_schemas(self, versions: List[str]) -> None:
+        for version in versions:
+            self.schemas[version] = ResponseSchemas(self.api, spec_loader.load_schemas(version))
+
+    def _wait_for_change(self, files: Snapshot) -> Tuple[Snapshot, Set[str]]:
+        interval = self.args.watch_interval_ms / 1000.0
+        while True:
+            time.sleep(interval)
+            current = snapshot(self.patterns)
+            changed = changed_files(files, current)
+            if not changed:
+                continue
+            while True:
+                time.sleep(SETTLE_MS / 1000.0)
+                settled = snapshot(self.patterns)
+                more = changed_files(current, settled)
+                if not more:
+                    return settled, changed
+                changed |= more
+                current = settled
+
+    def _affected(self, changed: Set[str]) -> Dict[str, Set[str]]:
+        """Flow files to re-run per version; reloads whatever the change touched."""
+        selected: Dict[str, Set[str]] = {version: set() for version in self.flows_by_version}
+        everything = False
+        if API_FILE in changed:
+            api = spec_loader.load_api()
+            digests = api_digests(api)
+            self.api = api
+            if digests[0] != self.digests[0]:
+                everything = True
+            before, after = self.digests[1], digests[1]
+            ops = {op for op in before.keys() | after.keys() if before.get(op) != after.get(op)}
+            self.digests = digests
+            for version, flows in self.flows_by_version.items():
+                selected[version].update(flow.file for flow in flows if operations_of(flow) & ops)
+            if self.args.validate_schemas:
+                self._load_schemas(list(self.flows_by_version))
+        for path in changed:
+            parent, name = os.path.split(path)
+            if parent in self.flow_dirs:
+                selected[self.flow_dirs[parent]].add(name)
+            elif parent in self.schema_dirs and self.args.validate_schemas:
+                version = self.schema_dirs[parent]
+                self._load_schemas([version])
+                selected[version].update(flow.file for flow in self.flows_by_version[version])
+        for version, files in selected.items():
+            if files or everything:
+                self.flows_by_version[version] = spec_loader.load_flows(version)
+        if everything:
+            return {version: {flow.file for flow in flows} for version, flows in self.flows_by_version.items()}
+        return selected
+
+    def _restart(self) -> bool:
+        self.log("RUN: runtime source changed; restarting runtime")
+        if self.runtime is not None:
+            self.runtime.stop()
+            self.runtime = None
+        # Connections to the old process are dead; start the new pool from scratch.
+        flow_http.close_all()
+        try:
+            self.runtime, self.startup_ms = self.start_runtime()
+        except RuntimeError as e:
+            self.fail(str(e))
+            return False
+        return True
+
+    def _run(self, selected: Dict[str, Set[str]]) -> Optional[bool]:
+        """Re-run the selected flows; whether they passed, or None when nothing needed to run."""
+        started = time.perf_counter()
+        runs = {
+            version: [flow for flow in self.flows_by_version[version] if flow.file in files]
+            for version, files in selected.items()
+            if files
+        }
+        total = sum(len(flows) for flows in self.flows_by_version.values())
+        count = sum(len(flows) for flows in runs.values())
+        if not count:
+            self.log("WATCH: no flows affected by the change; waiting for changes")
+            return None
+        passed = True
+        with ThreadPoolExecutor(max_workers=max(1, self.args.concurrency)) as pool:
+            for version, flows in runs.items():
+                schemas = self.schemas[version]
+                results = pool.map(lambda flow: run_flow(flow, self.base_url, schemas), flows)
+                label = f" for spec v{version}" if len(self.flows_by_version) > 1 else ""
+                errors, _ = self.summarize(flows, results, self.startup_ms, label)
+                passed = passed and not errors
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.log(f"WATCH: re-ran {count} of {total} flow files in {elapsed_ms:.0f} ms; waiting for changes")
+        return passed
+
+    def run(self, initial_rc: int) -> int:
+        files = snapshot(self.patterns)
+        rc = initial_rc
+        self.log(f"WATCH: watching {len(files)} files every {self.args.watch_interval_ms:g} ms (Ctrl-C to stop)")
+        runtime_files = set(snapshot(self.runtime_globs))
+        try:
+            while True:
+                files, changed = self._wait_for_change(files)
+                current_runtime_files = set(snapshot(self.runtime_globs))
+                runtime_changed = bool(changed & (runtime_files | current_runtime_files))
+                runtime_files = current_runtime_files
+                try:
+                    selected = self._affected(changed - runtime_files)
+                except (ValueError, yaml.YAMLError) as e:
+                    self.fail(f"cannot reload changed spec files: {e}")
+                    rc = 1
+                    continue
+                if runtime_changed:
+                    if self.args.start_cmd and not self._restart():
+                        rc = 1
+                        continue
+                    selected = {v: {flow.file for flow in flows} for v, flows in self.flows_by_version.items()}
+                passed = self._run(selected)
+                if passed is not None:
+                    rc = 0 if passed else 1
+        except KeyboardInterrupt:
+            self.log("WATCH: stopped")
+            return rc
+        finally:
+            # The caller stops the runtime it started; restarted ones are ours.
+            if self.runtime is not None and self.runtime is not self.initial_runtime:
+                self.runtime.stop()
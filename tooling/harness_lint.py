@@ -3,6 +3,8 @@ import re
 import sys
 from pathlib import Path
 
+from repo_scan import RepoScan
+
 ROOT = Path(__file__).resolve().parents[1]
 
 REQUIRED_FILES = [
@@ -48,51 +50,56 @@ def ok(msg: str) -> None:
     print(f"OK: {msg}")
 
 
-def check_paths() -> list[str]:
+def check_paths(scan: RepoScan) -> list[str]:
     errs = []
     for rel in REQUIRED_FILES:
-        if not (ROOT / rel).is_file():
+        if not scan.is_file(rel):
             errs.append(f"missing file: {rel}")
     for rel in REQUIRED_DIRS:
-        if not (ROOT / rel).is_dir():
+        if not scan.is_dir(rel):
             errs.append(f"missing directory: {rel}")
     return errs
 
 
-def check_agents_size() -> list[str]:
-    p = ROOT / "AGENTS.md"
-    if not p.exists():
+def check_agents_size(scan: RepoScan) -> list[str]:
+    if not scan.is_file("AGENTS.md"):
         return ["AGENTS.md missing"]
-    lines = p.read_text(encoding="utf-8").splitlines()
-    if len(lines) > MAX_AGENTS_LINES:
-        return [f"AGENTS.md too long ({len(lines)} lines > {MAX_AGENTS_LINES})"]
+    lines = scan.fact("AGENTS.md", "lines", lambda text: len(text.splitlines()))
+    if lines > MAX_AGENTS_LINES:
+        return [f"AGENTS.md too long ({lines} lines > {MAX_AGENTS_LINES})"]
     return []
 
 
-def check_index_links() -> list[str]:
-    p = ROOT / "docs/index.md"
-    if not p.exists():
+def index_links(text: str) -> list[str]:
+    return re.findall(r"\[[^\]]+\]\(([^)]+)\)", text)
+
+
+def check_index_links(scan: RepoScan) -> list[str]:
+    if not scan.is_file("docs/index.md"):
         return ["docs/index.md missing"]
+    p = ROOT / "docs/index.md"
+    root = ROOT.resolve()
     errs = []
-    text = p.read_text(encoding="utf-8")
-    links = re.findall(r"\[[^\]]+\]\(([^)]+)\)", text)
-    for link in links:
+    for link in scan.fact("docs/index.md", "links", index_links):
         if link.startswith("http://") or link.startswith("https://") or link.startswith("#"):
             continue
         target = (p.parent / link).resolve() if not link.startswith("/") else (ROOT / link[1:]).resolve()
-        if ROOT.resolve() not in target.parents and target != ROOT.resolve():
+        if root not in target.parents and target != root:
             errs.append(f"docs/index.md has out-of-repo link: {link}")
             continue
-        if not target.exists():
+        if not scan.exists(target.relative_to(root).as_posix() if target != root else ""):
             errs.append(f"docs/index.md points to missing path: {link}")
     return errs
 
 
+def check(scan: RepoScan) -> list[str]:
+    return check_paths(scan) + check_agents_size(scan) + check_index_links(scan)
+
+
 def main() -> int:
-    errs = []
-    errs.extend(check_paths())
-    errs.extend(check_agents_size())
-    errs.extend(check_index_links())
+    scan = RepoScan()
+    errs = check(scan)
+    scan.save()
 
     if errs:
         for e in errs:
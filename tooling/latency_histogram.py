@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""Compact, mergeable latency histogram with HDR-style logarithmic buckets."""
+import math
+from typing import Dict, Optional
+
+# Bucket boundaries grow by 1% so any recorded value is reported within 1% of its true value.
+RELATIVE_PRECISION = 0.01
+_LOG_BASE = math.log1p(RELATIVE_PRECISION)
+# Values are bucketed in microseconds between 1us and 1h, which caps a histogram at ~2.6k buckets.
+_MIN_US = 1.0
+_MAX_US = 3_600_000_000.0
+
+
+def _bucket(ms: float) -> int:
+    us = min(max(ms * 1000.0, _MIN_US), _MAX_US)
+    return int(math.log(us) / _LOG_BASE)
+
+
+def _bucket_upper_ms(idx: int) -> float:
+    return math.exp((idx + 1) * _LOG_BASE) / 1000.0
+
+
+class LatencyHistogram:
+    """Records latencies in milliseconds; memory is bounded by the bucket range, not the sample count."""
+
+    __slots__ = ("counts", "count", "total_ms", "min_ms", "max_ms")
+
+    def __init__(self):
+        self.counts: Dict[int, int] = {}
+        self.count = 0
+        self.total_ms = 0.0
+        self.min_ms = math.inf
+        self.max_ms = 0.0
+
+    def record(self, ms: float) -> None:
+        idx = _bucket(ms)
+        self.counts[idx] = self.counts.get(idx, 0) + 1
+        self.count += 1
+        self.total_ms += ms
+        self.min_ms = min(self.min_ms, ms)
+        self.max_ms = max(self.max_ms, ms)
+
+    def merge(self, other: "LatencyHistogram") -> "LatencyHistogram":
+        for idx, n in other.counts.items():
+            self.counts[idx] = self.counts.get(idx, 0) + n
+        self.count += other.count
+        self.total_ms += other.total_ms
+        self.min_ms = min(self.min_ms, other.min_ms)
+        self.max_ms = max(self.max_ms, other.max_ms)
+        return self
+
+    def percentile(self, pct: float) -> Optional[float]:
+        """Upper bound of the bucket holding the pct-th percentile, clamped to the observed range."""
+        if not self.count:
+            return None
+        rank = max(1, math.ceil(self.count * pct / 100.0))
+        seen = 0
+        for idx in sorted(self.counts):
+            seen += self.counts[idx]
+            if seen >= rank:
+                return min(max(_bucket_upper_ms(idx), self.min_ms), self.max_ms)
+        return self.max_ms
+
+    def to_dict(self) -> dict:
+        """Summary plus raw buckets, so reports written by separate runs can be merged later."""
+        return {
+            "count": self.count,
+            "mean_ms": self.mean_ms,
+            "min_ms": self.min_ms if self.count else None,
+            "max_ms": self.max_ms if self.count else None,
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "p99_ms": self.percentile(99),
+            "total_ms": self.total_ms,
+            "buckets": {str(idx): n for idx, n in sorted(self.counts.items())},
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "LatencyHistogram":
+        hist = cls()
+        hist.counts = {int(idx): int(n) for idx, n in data.get("buckets", {}).items()}
+        hist.count = int(data.get("count", 0))
+        hist.total_ms = float(data.get("total_ms", 0.0))
+        if hist.count:
+            hist.min_ms = float(data["min_ms"])
+            hist.max_ms = float(data["max_ms"])
+        return hist
+
+    @property
+    def mean_ms(self) -> Optional[float]:
+        return self.total_ms / self.count if self.count else None
+
+    def summary(self) -> str:
+        if not self.count:
+            return "n=0"
+        return (
+            f"n={self.count} p50={self.percentile(50):.1f} p95={self.percentile(95):.1f} "
+            f"p99={self.percentile(99):.1f} max={self.max_ms:.1f} ms"
+        )
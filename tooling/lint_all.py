@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""Run every repository lint over one shared scan: the tree is walked and each file read once."""
+import sys
+
+import architecture_lint
+import doc_gardener
+import harness_lint
+import release_linkage_lint
+from repo_scan import RepoScan
+
+CHECKS = [
+    ("harness lint", harness_lint.check),
+    ("architecture lint", architecture_lint.check),
+    ("release linkage lint", release_linkage_lint.check),
+    ("doc-gardener check", doc_gardener.check),
+]
+
+
+def fail(msg: str) -> None:
+    print(f"FAIL: {msg}")
+
+
+def ok(msg: str) -> None:
+    print(f"OK: {msg}")
+
+
+def main() -> int:
+    scan = RepoScan()
+    failed = 0
+    for name, check in CHECKS:
+        errors = check(scan)
+        for e in errors:
+            fail(e)
+        if errors:
+            failed += 1
+        else:
+            ok(f"{name} passed")
+    scan.save()
+    if failed:
+        fail(f"{failed} of {len(CHECKS)} lints failed ({len(scan.files)} files scanned)")
+        return 1
+    ok(f"all {len(CHECKS)} lints passed ({len(scan.files)} files scanned)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""Opt-in profiling of the evaluator and fixture runtime, attributed per flow, step or route.
+
+`cprofile` collects deterministic cProfile data and writes pstats files (one combined, one per
+section). Only one profiler may be active per process on Python 3.12+, so `cprofile` runs
+sections one at a time: concurrent flows, steps or requests wait for each other. `sample` walks
+the stacks of threads inside a section every few milliseconds and writes collapsed stacks
+(`section;frame;...;frame count`) for flamegraph tools; its overhead does not grow with call
+counts and sections stay concurrent, so it suits load runs.
+"""
+import cProfile
+import os
+import pstats
+import re
+import sys
+import threading
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Dict, List, Optional
+
+MODES = ("cprofile", "sample")
+SAMPLE_INTERVAL_SEC = 0.002
+
+_NO_SECTION = nullcontext()
+ACTIVE: Optional["Profiler"] = None
+
+
+class Profiler:
+    def __init__(self, mode: str, scope: str, interval: float = SAMPLE_INTERVAL_SEC):
+        if mode not in MODES:
+            raise ValueError(f"unknown profile mode {mode!r}; expected one of {', '.join(MODES)}")
+        self.mode = mode
+        self.scope = scope
+        self.interval = interval
+        self._lock = threading.Lock()
+        # cprofile: held for the whole section, so at most one cProfile.Profile is enabled at a time.
+        self._section_lock = threading.Lock()
+        self._stats: Dict[str, pstats.Stats] = {}
+        # Sampling: thread ident -> current section, and collapsed stack -> sample count.
+        self._labels: Dict[int, str] = {}
+        self._samples: Dict[str, int] = {}
+        self._stop = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+        if mode == "sample":
+            self._sampler = threading.Thread(target=self._sample_loop, name="profile-sampler", daemon=True)
+            self._sampler.start()
+
+    @contextmanager
+    def profile(self, label: str):
+        if self.mode == "sample":
+            ident = threading.get_ident()
+            self._labels[ident] = label
+            try:
+                yield
+            finally:
+                self._labels.pop(ident, None)
+            return
+        # Each section gets its own profiler for per-section stats; the section lock keeps them
+        # from overlapping, which Python 3.12+ rejects ("Another profiling tool is already active").
+        with self._section_lock:
+            prof = cProfile.Profile()
+            prof.enable()
+            try:
+                yield
+            finally:
+                prof.disable()
+                with self._lock:
+                    if label in self._stats:
+                        self._stats[label].add(prof)
+                    else:
+                        self._stats[label] = pstats.Stats(prof)
+
+    def _sample_loop(self) -> None:
+        while not self._stop.wait(self.interval):
+            labels = dict(self._labels)
+            if not labels:
+                continue
+            frames = sys._current_frames()
+            for ident, label in labels.items():
+                frame = frames.get(ident)
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                if not stack:
+                    continue
+                key = ";".join([label.replace(";", ","), *reversed(stack)])
+                self._samples[key] = self._samples.get(key, 0) + 1
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._sampler is not None:
+            self._sampler.join()
+
+    def write(self, prefix: Path) -> List[Path]:
+        """Stop collecting and write the results next to `prefix`; returns the files written."""
+        self.stop()
+        prefix.parent.mkdir(parents=True, exist_ok=True)
+        if self.mode == "sample":
+            path = prefix.with_name(prefix.name + ".collapsed")
+            path.write_text("".join(f"{stack} {n}\n" for stack, n in sorted(self._samples.items())), encoding="utf-8")
+            return [path]
+        written: List[Path] = []
+        combined: Optional[pstats.Stats] = None
+        for label, stats in sorted(self._stats.items()):
+            slug = re.sub(r"[^A-Za-z0-9_.-]+", "_", label).strip("_") or "section"
+            path = prefix.with_name(f"{prefix.name}.{slug}.pstats")
+            stats.dump_stats(str(path))
+            written.append(path)
+            if combined is None:
+                combined = pstats.Stats(str(path))
+            else:
+                combined.add(str(path))
+        if combined is not None:
+            path = prefix.with_name(prefix.name + ".pstats")
+            combined.dump_stats(str(path))
+            written.insert(0, path)
+        return written
+
+    def hottest(self, limit: int = 5) -> List[str]:
+        """Busiest sections: by cumulative profiled time (cprofile) or by samples (sample)."""
+        if self.mode == "sample":
+            per_label: Dict[str, int] = {}
+            for stack, n in self._samples.items():
+                label = stack.split(";", 1)[0]
+                per_label[label] = per_label.get(label, 0) + n
+            top = sorted(per_label.items(), key=lambda item: -item[1])[:limit]
+            return [f"{label}: {n} samples" for label, n in top]
+        totals = {label: stats.total_tt for label, stats in self._stats.items()}
+        top = sorted(totals.items(), key=lambda item: -item[1])[:limit]
+        return [f"{label}: {seconds * 1000:.1f} ms profiled" for label, seconds in top]
+
+
+def configure(mode: str, scope: str) -> Profiler:
+    """Install the process-wide profiler that `section` reports to."""
+    global ACTIVE
+    ACTIVE = Profiler(mode, scope)
+    return ACTIVE
+
+
+def section(label: str, level: str):
+    """Profile the enclosed block as `label` when a profiler is configured for `level`; else a no-op."""
+    profiler = ACTIVE
+    if profiler is None or profiler.scope != level:
+        return _NO_SECTION
+    return profiler.profile(label)
+
+
+def output_prefix(explicit: str, report: str, default: str) -> Path:
+    """`--profile-out`, else the report path with `.profile` in place of `.json`, else `default`."""
+    if explicit:
+        return Path(explicit)
+    if report:
+        path = Path(report)
+        return path.with_name(path.stem + ".profile")
+    return Path(default)
@@ -1,10 +1,10 @@
 #!/usr/bin/env python3
 import sys
-from pathlib import Path
 
-ROOT = Path(__file__).resolve().parents[1]
-CHANGELOG = ROOT / "CHANGELOG.md"
-VERSION_FILE = ROOT / "spec/VERSION"
+from repo_scan import RepoScan
+
+CHANGELOG = "CHANGELOG.md"
+VERSION_FILE = "spec/VERSION"
 
 
 def fail(msg: str) -> None:
@@ -15,16 +15,27 @@ def ok(msg: str) -> None:
     print(f"OK: {msg}")
 
 
-def main() -> int:
-    version = VERSION_FILE.read_text(encoding="utf-8").strip()
-    text = CHANGELOG.read_text(encoding="utf-8")
+def expected_tag(scan: RepoScan) -> str:
+    return f"spec-driven-starter-spec@v{scan.read_text(VERSION_FILE).strip()}"
+
 
-    expected = f"spec-driven-starter-spec@v{version}"
-    if expected not in text:
-        fail(f"CHANGELOG.md must mention pinned spec tag: {expected}")
+def check(scan: RepoScan) -> list[str]:
+    expected = expected_tag(scan)
+    if not scan.fact(CHANGELOG, f"mentions:{expected}", lambda text: expected in text):
+        return [f"CHANGELOG.md must mention pinned spec tag: {expected}"]
+    return []
+
+
+def main() -> int:
+    scan = RepoScan()
+    errors = check(scan)
+    scan.save()
+    if errors:
+        for e in errors:
+            fail(e)
         return 1
 
-    ok(f"release linkage lint passed ({expected})")
+    ok(f"release linkage lint passed ({expected_tag(scan)})")
     return 0
 
 
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""Single-pass repository scan shared by the lint tools.
+
+The tree is walked once (skipping `.git` and other generated directories) and file contents are
+read at most once per process. Facts derived from a file, such as its line count, are cached in
+`.cache/lint/scan.json` keyed by mtime and size, falling back to a content hash, so a later run
+only re-reads and re-checks the files that changed.
+"""
+import fnmatch
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Set
+
+ROOT = Path(__file__).resolve().parents[1]
+CACHE_FILE = ROOT / ".cache/lint/scan.json"
+# Bump when the cache layout changes.
+CACHE_FORMAT = 1
+# Directories that are recorded but never descended into.
+PRUNE = {".git", ".cache", "node_modules", "__pycache__"}
+
+
+class FileStat(NamedTuple):
+    mtime_ns: int
+    size: int
+
+
+class RepoScan:
+    def __init__(self, root: Path = ROOT, cache_file: Optional[Path] = CACHE_FILE):
+        self.root = root
+        self.cache_file = cache_file
+        self.files: Dict[str, FileStat] = {}
+        self.dirs: Set[str] = set()
+        self._texts: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._cache: Dict[str, dict] = self._load_cache()
+        self._walk(root, "")
+
+    def _walk(self, path: Path, prefix: str) -> None:
+        try:
+            entries = list(os.scandir(path))
+        except OSError:
+            return
+        for entry in entries:
+            rel = prefix + entry.name
+            if entry.is_dir(follow_symlinks=False):
+                self.dirs.add(rel)
+                if entry.name not in PRUNE:
+                    self._walk(Path(entry.path), rel + "/")
+            elif entry.is_dir():
+                # A symlink to a directory exists as a path but is not followed, so links cannot loop.
+                self.dirs.add(rel)
+            elif entry.is_file():
+                st = entry.stat()
+                self.files[rel] = FileStat(st.st_mtime_ns, st.st_size)
+
+    def _load_cache(self) -> Dict[str, dict]:
+        if self.cache_file is None:
+            return {}
+        try:
+            data = json.loads(self.cache_file.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        return data.get("files", {}) if data.get("format") == CACHE_FORMAT else {}
+
+    def save(self) -> None:
+        """Persist facts for files that still exist; a read-only checkout just means no cache."""
+        if self.cache_file is None:
+            return
+        with self._lock:
+            files = {rel: entry for rel, entry in self._cache.items() if rel in self.files}
+        try:
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.cache_file.with_suffix(".tmp")
+            tmp.write_text(json.dumps({"format": CACHE_FORMAT, "files": files}, sort_keys=True), encoding="utf-8")
+            tmp.replace(self.cache_file)
+        except OSError:
+            pass
+
+    def is_file(self, rel: str) -> bool:
+        return rel in self.files
+
+    def is_dir(self, rel: str) -> bool:
+        return rel.rstrip("/") in self.dirs
+
+    def exists(self, rel: str) -> bool:
+        rel = rel.rstrip("/")
+        if rel in self.files or rel in self.dirs or rel == "":
+            return True
+        # Paths inside pruned directories were not walked.
+        return rel.split("/", 1)[0] in PRUNE and (self.root / rel).exists()
+
+    def top_level_dirs(self) -> Set[str]:
+        return {rel for rel in self.dirs if "/" not in rel}
+
+    def glob(self, pattern: str) -> List[str]:
+        """Sorted relative paths of walked files matching an fnmatch pattern (`*` also crosses `/`)."""
+        return sorted(rel for rel in self.files if fnmatch.fnmatchcase(rel, pattern))
+
+    def read_text(self, rel: str) -> str:
+        text = self._texts.get(rel)
+        if text is None:
+            text = (self.root / rel).read_text(encoding="utf-8")
+            self._texts[rel] = text
+        return text
+
+    def fact(self, rel: str, name: str, compute: Callable[[str], Any]) -> Any:
+        """`compute(text)` for a file, reusing the cached value while the file is unchanged.
+
+        `name` must change whenever `compute` would give a different answer for the same text.
+        """
+        stat = self.files.get(rel)
+        if stat is None:
+            raise FileNotFoundError(rel)
+        with self._lock:
+            entry = self._cache.get(rel)
+            if entry is not None and (entry["mtime_ns"], entry["size"]) == tuple(stat) and name in entry["facts"]:
+                return entry["facts"][name]
+        text = self.read_text(rel)
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        with self._lock:
+            entry = self._cache.get(rel)
+            # Touched but identical files (e.g. after a checkout) keep their facts.
+            if entry is None or entry["sha256"] != digest:
+                entry = self._cache[rel] = {"sha256": digest, "facts": {}}
+            entry["mtime_ns"], entry["size"] = stat
+            if name in entry["facts"]:
+                return entry["facts"][name]
+        value = compute(text)
+        with self._lock:
+            entry["facts"][name] = value
+        return value
@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""Opt-in JSON Schema validation of response bodies against the contract in api/openapi.yaml.
+
+Schemas are compiled once into validator closures and cached per `$ref`. A component that the
+pinned spec also publishes under `schemas/*.schema.json` (matched by `title`) is validated
+against the pinned file, which is the stricter source of truth (e.g. `additionalProperties`).
+
+Supported keywords: type, nullable, enum, required, properties, additionalProperties,
+minLength, maxLength, pattern, format (date), minimum, maximum, items, minItems, maxItems
+and $ref. Annotations such as title or description are ignored; any other assertion keyword
+is rejected at compile time rather than silently skipped.
+"""
+import datetime
+import functools
+import re
+from typing import Any, Callable, Dict, FrozenSet, NamedTuple, Optional, Tuple
+
+from spec_loader import ApiSpec
+
+# Validator(value) -> (path, message) of the first violation, or None when the value conforms.
+# Paths are relative (".title", "[3].dueDate") and only built on failure, so a passing
+# check allocates nothing per value.
+Error = Tuple[str, str]
+Validator = Callable[[Any], Optional[Error]]
+
+COMPONENT_PREFIX = "#/components/schemas/"
+UNSUPPORTED = {"allOf", "anyOf", "oneOf", "not", "patternProperties", "uniqueItems", "const", "dependentRequired"}
+DATE = re.compile(r"\d{4}-\d{2}-\d{2}")
+
+# Bodies come from json.loads, so exact Python types identify JSON types (bool is not an integer).
+TYPES: Dict[str, FrozenSet[type]] = {
+    "string": frozenset({str}),
+    "boolean": frozenset({bool}),
+    "integer": frozenset({int}),
+    "number": frozenset({int, float}),
+    "array": frozenset({list}),
+    "object": frozenset({dict}),
+    "null": frozenset({type(None)}),
+}
+JSON_TYPE_NAMES = {str: "string", bool: "boolean", int: "integer", float: "number", list: "array", dict: "object"}
+
+
+def _json_type(value) -> str:
+    return JSON_TYPE_NAMES.get(type(value), "null" if value is None else type(value).__name__)
+
+
+@functools.lru_cache(maxsize=4096)
+def _is_date(value: str) -> bool:
+    if not DATE.fullmatch(value):
+        return False
+    try:
+        datetime.date.fromisoformat(value)
+    except ValueError:
+        return False
+    return True
+
+
+class SchemaCompiler:
+    """Compiles schema dicts into validators; `$ref` targets are compiled once and shared."""
+
+    def __init__(self, resolve: Callable[[str], dict]):
+        self._resolve = resolve
+        self._refs: Dict[str, Validator] = {}
+
+    def ref(self, ref: str) -> Validator:
+        cached = self._refs.get(ref)
+        if cached is not None:
+            return cached
+        # Register a forwarder first so recursive schemas terminate.
+        target: Dict[str, Validator] = {}
+        self._refs[ref] = lambda value: target["v"](value)
+        target["v"] = self.compile(self._resolve(ref))
+        self._refs[ref] = target["v"]
+        return target["v"]
+
+    def compile(self, schema: dict) -> Validator:
+        if not isinstance(schema, dict):
+            raise ValueError(f"schema must be an object, got {schema!r}")
+        if "$ref" in schema:
+            return self.ref(schema["$ref"])
+        unsupported = sorted(set(schema) & UNSUPPORTED)
+        if unsupported:
+            raise ValueError(f"unsupported schema keywords {unsupported}")
+
+        checks = []
+        nullable = bool(schema.get("nullable", False))
+        types = schema.get("type")
+        names: Tuple[str, ...] = ()
+        if types is not None:
+            names = tuple([types] if isinstance(types, str) else types)
+            unknown = [t for t in names if t not in TYPES]
+            if unknown:
+                raise ValueError(f"unknown schema types {unknown}")
+            allowed = frozenset().union(*(TYPES[t] for t in names))
+            expected = "|".join(names)
+
+            def check_type(value):
+                if type(value) not in allowed:
+                    return "", f"expected {expected}, got {_json_type(value)}"
+                return None
+
+            checks.append(check_type)
+        if "enum" in schema:
+            options = list(schema["enum"])
+            checks.append(lambda v: None if v in options else ("", f"{v!r} is not one of {options!r}"))
+
+        for kind, keyword_checks in (
+            ("string", self._string_checks(schema)),
+            ("number", self._number_checks(schema)),
+            ("array", self._array_checks(schema)),
+            ("object", self._object_checks(schema)),
+        ):
+            if not keyword_checks:
+                continue
+            # A single declared type was already enforced, so its keywords need no type guard.
+            if names == (kind,) or (kind == "number" and names == ("integer",)):
+                checks.extend(keyword_checks)
+            else:
+                checks.append(self._when(TYPES[kind], keyword_checks))
+
+        checks = tuple(checks)
+        if len(checks) == 1 and not nullable:
+            return checks[0]
+
+        def validate(value):
+            if value is None and nullable:
+                return None
+            for check in checks:
+                error = check(value)
+                if error is not None:
+                    return error
+            return None
+
+        return validate
+
+    @staticmethod
+    def _when(kinds: FrozenSet[type], checks) -> Validator:
+        """Apply type-specific keywords only to values of that JSON type, as JSON Schema does."""
+        checks = tuple(checks)
+
+        def check(value):
+            if type(value) in kinds:
+                for c in checks:
+                    error = c(value)
+                    if error is not None:
+                        return error
+            return None
+
+        return check
+
+    def _string_checks(self, schema: dict):
+        checks = []
+        if "minLength" in schema:
+            lo = int(schema["minLength"])
+            checks.append(lambda v: None if len(v) >= lo else ("", f"shorter than minLength {lo}"))
+        if "maxLength" in schema:
+            hi = int(schema["maxLength"])
+            checks.append(lambda v: None if len(v) <= hi else ("", f"longer than maxLength {hi}"))
+        if "pattern" in schema:
+            pattern = re.compile(schema["pattern"])
+            checks.append(
+                lambda v: None if pattern.search(v) else ("", f"does not match pattern {pattern.pattern!r}")
+            )
+        # Other formats are annotations only, as in JSON Schema.
+        if schema.get("format") == "date":
+            checks.append(lambda v: None if _is_date(v) else ("", f"expected format date, got {v!r}"))
+        return checks
+
+    def _number_checks(self, schema: dict):
+        checks = []
+        if "minimum" in schema:
+            lo = schema["minimum"]
+            checks.append(lambda v: None if v >= lo else ("", f"{v!r} is below minimum {lo!r}"))
+        if "maximum" in schema:
+            hi = schema["maximum"]
+            checks.append(lambda v: None if v <= hi else ("", f"{v!r} is above maximum {hi!r}"))
+        return checks
+
+    def _array_checks(self, schema: dict):
+        checks = []
+        if "minItems" in schema:
+            lo = int(schema["minItems"])
+            checks.append(lambda v: None if len(v) >= lo else ("", f"fewer than minItems {lo}"))
+        if "maxItems" in schema:
+            hi = int(schema["maxItems"])
+            checks.append(lambda v: None if len(v) <= hi else ("", f"more than maxItems {hi}"))
+        if "items" in schema:
+            item = self.compile(schema["items"])
+
+            def check_items(v):
+                for idx, value in enumerate(v):
+                    error = item(value)
+                    if error is not None:
+                        return f"[{idx}]{error[0]}", error[1]
+                return None
+
+            checks.append(check_items)
+        return checks
+
+    def _object_checks(self, schema: dict):
+        checks = []
+        required = tuple(schema.get("required", ()))
+        if required:
+            required_set = frozenset(required)
+
+            def check_required(v):
+                if not v.keys() >= required_set:
+                    missing = next(name for name in required if name not in v)
+                    return "", f"missing required property '{missing}'"
+                return None
+
+            checks.append(check_required)
+        properties = {name: self.compile(sub) for name, sub in (schema.get("properties") or {}).items()}
+        additional = schema.get("additionalProperties", True)
+        extra: Optional[Validator] = None
+        if isinstance(additional, dict):
+            extra = self.compile(additional)
+        if properties or additional is not True:
+            closed = additional is False
+
+            def check_properties(v):
+                for name, value in v.items():
+                    sub = properties.get(name, extra)
+                    if sub is None:
+                        if closed:
+                            return "", f"unexpected property '{name}'"
+                        continue
+                    error = sub(value)
+                    if error is not None:
+                        return f".{name}{error[0]}", error[1]
+                return None
+
+            checks.append(check_properties)
+        return checks
+
+
+class ResponseValidator(NamedTuple):
+    label: str
+    body: Validator
+    # Validator for one element when the response is an array; used on streamed lists.
+    items: Optional[Validator]
+
+    def _describe(self, root: str, found: Error) -> str:
+        return f"response does not match the {self.label} schema at {root}{found[0]}: {found[1]}"
+
+    def error(self, body) -> Optional[str]:
+        found = self.body(body)
+        return None if found is None else self._describe("$", found)
+
+    def item_error(self, item, index: int) -> Optional[str]:
+        found = self.items(item) if self.items is not None else None
+        return None if found is None else self._describe(f"$[{index}]", found)
+
+
+class ResponseSchemas:
+    """Validators for each (method, path, status) response that declares a JSON schema."""
+
+    def __init__(self, api: ApiSpec, pinned: Optional[Dict[str, dict]] = None):
+        self.api = api
+        self.pinned = pinned or {}
+        self.compiler = SchemaCompiler(self._resolve)
+        self._responses: Dict[Tuple[str, str, int], Optional[ResponseValidator]] = {}
+
+    def _resolve(self, ref: str) -> dict:
+        if not ref.startswith(COMPONENT_PREFIX):
+            raise ValueError(f"unsupported $ref {ref!r}; only {COMPONENT_PREFIX}<name> is resolved")
+        name = ref[len(COMPONENT_PREFIX):]
+        if name in self.pinned:
+            return self.pinned[name]
+        if name not in self.api.schemas:
+            raise ValueError(f"unresolved $ref {ref!r}")
+        return self.api.schemas[name]
+
+    def validator(self, method: str, path: str, status: int) -> Optional[ResponseValidator]:
+        key = (method, path, status)
+        if key not in self._responses:
+            self._responses[key] = self._build(method, path, status)
+        return self._responses[key]
+
+    def _build(self, method: str, path: str, status: int) -> Optional[ResponseValidator]:
+        op = self.api.operation(method, path)
+        if op is None:
+            return None
+        response = (op.raw.get("responses") or {}).get(str(status)) or {}
+        schema = ((response.get("content") or {}).get("application/json") or {}).get("schema")
+        if schema is None:
+            return None
+        label = f"{method} {path} {status}"
+        resolved = self._resolve(schema["$ref"]) if "$ref" in schema else schema
+        items = None
+        if resolved.get("type") == "array" and "items" in resolved:
+            items = self.compiler.compile(resolved["items"])
+        return ResponseValidator(label, self.compiler.compile(schema), items)
+
+    def compile_all(self) -> int:
+        """Compile every declared response schema up front, so bad schemas fail before any step runs."""
+        count = 0
+        for (method, path), op in self.api.operations.items():
+            for code in op.responses:
+                if code.isdigit() and self.validator(method, path, int(code)) is not None:
+                    count += 1
+        return count
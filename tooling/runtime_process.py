@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""Start, probe, and stop the runtime under test for the flow evaluators."""
+import os
+import re
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.parse
+from pathlib import Path
+from typing import Optional
+
+import flow_http
+
+DEFAULT_INITIAL_INTERVAL_MS = 10.0
+DEFAULT_MAX_INTERVAL_MS = 250.0
+BACKOFF_FACTOR = 1.5
+
+
+class RuntimeProcess:
+    """Runtime started from a shell command in its own process group.
+
+    With `ready_pattern`, the process output is piped and relayed line by line so that a
+    matching log line can signal readiness as soon as it is printed.
+    """
+
+    def __init__(self, cmd: str, cwd: Path, ready_pattern: Optional[str] = None, env: Optional[dict] = None):
+        self.cmd = cmd
+        self.log_ready = threading.Event()
+        self.ready_line: Optional[str] = None
+        self._pattern = re.compile(ready_pattern) if ready_pattern else None
+        child_env = dict(os.environ, **(env or {}))
+        stdout = None
+        if self._pattern is not None:
+            # Python runtimes block-buffer a piped stdout, which would delay the readiness line.
+            child_env.setdefault("PYTHONUNBUFFERED", "1")
+            stdout = subprocess.PIPE
+        self.started = time.perf_counter()
+        self.proc = subprocess.Popen(
+            cmd,
+            shell=True,
+            cwd=cwd,
+            env=child_env,
+            stdout=stdout,
+            stderr=subprocess.STDOUT if stdout else None,
+            start_new_session=True,
+        )
+        if stdout is not None:
+            threading.Thread(target=self._relay_output, daemon=True).start()
+
+    def _relay_output(self) -> None:
+        for raw in iter(self.proc.stdout.readline, b""):
+            line = raw.decode("utf-8", errors="replace")
+            sys.stdout.write(line)
+            sys.stdout.flush()
+            if not self.log_ready.is_set() and self._pattern.search(line):
+                self.ready_line = line.strip()
+                self.log_ready.set()
+
+    def exit_code(self) -> Optional[int]:
+        return self.proc.poll()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        # Signal the whole group: with shell=True the runtime is usually a child of the shell.
+        try:
+            os.killpg(self.proc.pid, signal.SIGTERM)
+        except ProcessLookupError:
+            return
+        try:
+            self.proc.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            os.killpg(self.proc.pid, signal.SIGKILL)
+            self.proc.wait()
+
+
+def tcp_listening(host: str, port: int, timeout: float) -> bool:
+    try:
+        with socket.create_connection((host, port), timeout=timeout):
+            return True
+    except OSError:
+        return False
+
+
+def wait_until_ready(
+    base_url: str,
+    wait_path: str,
+    timeout_sec: float,
+    runtime: Optional[RuntimeProcess] = None,
+    ready_file: str = "",
+    initial_interval_ms: float = DEFAULT_INITIAL_INTERVAL_MS,
+    max_interval_ms: float = DEFAULT_MAX_INTERVAL_MS,
+    log=print,
+) -> float:
+    """Poll until the runtime is ready; returns milliseconds since the runtime was started.
+
+    Any of these signals readiness: an HTTP response below 500 from `wait_path` (probed only
+    once a TCP connect succeeds), a log line matching the runtime's ready pattern, or the
+    appearance of `ready_file`. Probes back off exponentially from `initial_interval_ms` up to
+    `max_interval_ms`, so a fast runtime is detected within milliseconds of becoming ready.
+    """
+    started = runtime.started if runtime is not None else time.perf_counter()
+    deadline = started + timeout_sec
+    url = f"{base_url}{wait_path}"
+    parts = urllib.parse.urlsplit(base_url)
+    host = parts.hostname or "127.0.0.1"
+    port = parts.port or (443 if parts.scheme == "https" else 80)
+    interval = initial_interval_ms / 1000.0
+
+    def ready(how: str) -> float:
+        ready_ms = (time.perf_counter() - started) * 1000
+        log(f"OK: runtime ready ({how}) in {ready_ms:.1f} ms")
+        return ready_ms
+
+    while True:
+        if runtime is not None:
+            if runtime.log_ready.is_set():
+                return ready(f"log line {runtime.ready_line!r}")
+            code = runtime.exit_code()
+            if code is not None:
+                raise RuntimeError(f"runtime exited with code {code} before becoming ready: {runtime.cmd}")
+        if ready_file and Path(ready_file).exists():
+            return ready(f"file {ready_file}")
+        if tcp_listening(host, port, timeout=max(interval, 0.05)):
+            try:
+                # A private connection: reusing the flows' pool would hide the first flow's connect cost.
+                status = flow_http.request_once("GET", url, None, {"Accept": "application/json"}, timeout=2.0).status
+                if 200 <= status < 500:
+                    return ready(f"{url} status {status}")
+            except Exception:
+                pass
+
+        remaining = deadline - time.perf_counter()
+        if remaining <= 0:
+            break
+        # Waiting on the log event (rather than sleeping) wakes up as soon as the line is printed.
+        pause = min(interval, remaining)
+        if runtime is not None:
+            runtime.log_ready.wait(pause)
+        else:
+            time.sleep(pause)
+        interval = min(interval * BACKOFF_FACTOR, max_interval_ms / 1000.0)
+    raise RuntimeError(f"runtime did not become ready within {timeout_sec:g}s: {url}")
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""Parse-once loading of the OpenAPI contract and flow fixtures shared by both flow evaluators.
+
+Parsed objects are pickled under `.cache/spec/`, keyed by the pinned `spec/CHECKSUM` digest plus
+the path, mtime and size of every source file, so unchanged specs are never re-parsed.
+"""
+import glob
+import hashlib
+import json
+import pickle
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+import yaml
+
+from flow_assertions import AssertionPlan
+from flow_policy import DEFAULT_POLICY, RequestPolicy, compile_policy
+
+ROOT = Path(__file__).resolve().parents[1]
+CACHE_DIR = ROOT / ".cache/spec"
+# Bump when the shape of the cached objects changes.
+CACHE_FORMAT = 4
+# Modules whose code builds the cached objects; editing any of them invalidates the cache.
+CODE_FILES = tuple(Path(__file__).with_name(f) for f in ("spec_loader.py", "flow_policy.py", "flow_assertions.py"))
+
+# libyaml's C loader is several times faster; fall back to the pure-Python one when absent.
+YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# Flow action -> (HTTP method, OpenAPI path); the single source for both evaluators.
+ACTION_MAP: Dict[str, Tuple[str, str]] = {
+    "health_check": ("GET", "/health"),
+    "create_todo": ("POST", "/todos"),
+    "list_todos": ("GET", "/todos"),
+    "get_todo": ("GET", "/todos/{id}"),
+    "create_todos_bulk": ("POST", "/todos:batch"),
+}
+
+
+@dataclass(frozen=True)
+class Step:
+    index: int
+    action: Optional[str]
+    method: Optional[str]
+    path: Optional[str]
+    request: Any = None
+    params: Dict[str, Any] = field(default_factory=dict)
+    query: Dict[str, Any] = field(default_factory=dict)
+    query_from_previous: Dict[str, str] = field(default_factory=dict)
+    expect_status: Optional[int] = None
+    expect_latency_ms: Optional[float] = None
+    expect_body: Dict[str, Any] = field(default_factory=dict)
+    stream: bool = False
+    policy: RequestPolicy = DEFAULT_POLICY
+    raw: Dict[str, Any] = field(default_factory=dict)
+    # `expect_body` compiled once at load time.
+    assertions: AssertionPlan = field(default=AssertionPlan("", 0, None), compare=False, repr=False)
+
+
+@dataclass(frozen=True)
+class Flow:
+    name: str
+    file: str
+    path: Path
+    version: str
+    slo: Dict[str, Any]
+    steps: Tuple[Step, ...]
+
+
+@dataclass(frozen=True)
+class Operation:
+    path: str
+    method: str
+    responses: FrozenSet[str]
+    query_params: FrozenSet[str]
+    raw: Dict[str, Any]
+
+
+@dataclass(frozen=True)
+class ApiSpec:
+    operations: Dict[Tuple[str, str], Operation]
+    schemas: Dict[str, Any]
+    raw: Dict[str, Any]
+
+    def operation(self, method: str, path: str) -> Optional[Operation]:
+        return self.operations.get((method.upper(), path))
+
+
+def load_yaml(p: Path):
+    return yaml.load(p.read_text(encoding="utf-8"), Loader=YamlLoader)
+
+
+def compile_step(index: int, raw, flow_raw: Optional[dict] = None, flow_name: str = "") -> Step:
+    raw = raw if isinstance(raw, dict) else {}
+    action = raw.get("action")
+    method, path = ACTION_MAP.get(action, (None, None))
+    status = raw.get("expect_status")
+    latency = raw.get("expect_latency_ms")
+    stream = bool(raw.get("stream", False))
+    try:
+        policy = compile_policy(raw, flow_raw or {}, method, stream)
+    except ValueError as e:
+        raise ValueError(f"step#{index}: {e}") from None
+    expect_body = dict(raw.get("expect_body") or {})
+    try:
+        assertions = AssertionPlan(flow_name, index, expect_body)
+    except (AttributeError, TypeError, ValueError) as e:
+        raise ValueError(f"step#{index}: invalid expect_body: {e}") from None
+    return Step(
+        index=index,
+        action=action,
+        method=method,
+        path=path,
+        request=raw.get("request"),
+        params=dict(raw.get("params") or {}),
+        query=dict(raw.get("query") or {}),
+        query_from_previous=dict(raw.get("query_from_previous") or {}),
+        expect_status=int(status) if status is not None else None,
+        expect_latency_ms=float(latency) if latency is not None else None,
+        expect_body=expect_body,
+        stream=stream,
+        policy=policy,
+        raw=raw,
+        assertions=assertions,
+    )
+
+
+def compile_flow(path: Path, version: str, raw) -> Flow:
+    raw = raw if isinstance(raw, dict) else {}
+    slo = raw.get("slo") if isinstance(raw.get("slo"), dict) else {}
+    name = raw.get("name", path.stem)
+    try:
+        steps = tuple(compile_step(i, s, raw, name) for i, s in enumerate(raw.get("steps") or [], start=1))
+    except ValueError as e:
+        raise ValueError(f"{path.name}: {e}") from None
+    return Flow(name=name, file=path.name, path=path, version=version, slo=slo, steps=steps)
+
+
+def compile_api(raw) -> ApiSpec:
+    raw = raw if isinstance(raw, dict) else {}
+    operations = {}
+    for api_path, item in (raw.get("paths") or {}).items():
+        for method, op in (item or {}).items():
+            if not isinstance(op, dict):
+                continue
+            query = frozenset(p.get("name") for p in op.get("parameters", []) if p.get("in") == "query")
+            responses = frozenset(str(code) for code in (op.get("responses") or {}))
+            operations[(method.upper(), api_path)] = Operation(api_path, method.upper(), responses, query, op)
+    schemas = (raw.get("components") or {}).get("schemas") or {}
+    return ApiSpec(operations=operations, schemas=schemas, raw=raw)
+
+
+def code_digest(files=CODE_FILES) -> str:
+    """Digest of the source of `files`, for cache keys of results those files compute."""
+    h = hashlib.sha256()
+    for p in files:
+        h.update(p.read_bytes())
+    return h.hexdigest()
+
+
+def _cache_key(sources: List[Path]) -> str:
+    h = hashlib.sha256(f"format={CACHE_FORMAT}\ncode={code_digest()}\n".encode())
+    checksum = ROOT / "spec/CHECKSUM"
+    if checksum.exists():
+        h.update(checksum.read_bytes())
+    for p in sources:
+        st = p.stat()
+        h.update(f"{p}:{st.st_mtime_ns}:{st.st_size}\n".encode())
+    return h.hexdigest()
+
+
+def _cached(name: str, sources: List[Path], build, use_cache: bool):
+    if not use_cache:
+        return build()
+    key = _cache_key(sources)
+    cache_file = CACHE_DIR / f"{name}.pickle"
+    try:
+        with cache_file.open("rb") as f:
+            cached_key, data = pickle.load(f)
+        if cached_key == key:
+            return data
+    except (OSError, EOFError, pickle.UnpicklingError, ValueError, AttributeError):
+        pass
+    data = build()
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp = cache_file.with_suffix(".tmp")
+        with tmp.open("wb") as f:
+            pickle.dump((key, data), f, protocol=pickle.HIGHEST_PROTOCOL)
+        tmp.replace(cache_file)
+    except OSError:
+        # A read-only checkout just means no cache.
+        pass
+    return data
+
+
+def pinned_version() -> str:
+    return (ROOT / "spec/VERSION").read_text(encoding="utf-8").strip()
+
+
+def version_key(version: str) -> Tuple:
+    return tuple(int(part) if part.isdigit() else part for part in version.split("."))
+
+
+def available_versions() -> List[str]:
+    """Every vendored spec version, oldest first."""
+    names = [Path(p).name[len("starter-spec-v"):] for p in glob.glob(str(ROOT / "spec/starter-spec-v*/"))]
+    return sorted(names, key=version_key)
+
+
+def resolve_versions(selection: str) -> List[str]:
+    """Expand a `--versions` value: empty for the pinned version, `all`, or a comma-separated list."""
+    if not selection:
+        return [pinned_version()]
+    available = available_versions()
+    if selection == "all":
+        return available
+    versions = [v.strip().lstrip("v") for v in selection.split(",") if v.strip()]
+    unknown = [v for v in versions if v not in available]
+    if unknown:
+        raise ValueError(f"unknown spec versions {unknown}; available: {', '.join(available)}")
+    return sorted(dict.fromkeys(versions), key=version_key)
+
+
+def flow_files(version: str) -> List[Path]:
+    return [Path(p) for p in sorted(glob.glob(str(ROOT / f"spec/starter-spec-v{version}/flows/*.yaml")))]
+
+
+def load_flows(version: str, use_cache: bool = True) -> List[Flow]:
+    files = flow_files(version)
+    return _cached(
+        f"flows-v{version}",
+        files,
+        lambda: [compile_flow(p, version, load_yaml(p)) for p in files],
+        use_cache,
+    )
+
+
+def schema_files(version: str) -> List[Path]:
+    return [Path(p) for p in sorted(glob.glob(str(ROOT / f"spec/starter-spec-v{version}/schemas/*.schema.json")))]
+
+
+def load_schemas(version: str, use_cache: bool = True) -> Dict[str, Any]:
+    """Pinned JSON Schemas of a spec version, keyed by their `title`."""
+    files = schema_files(version)
+
+    def build():
+        schemas = {}
+        for p in files:
+            schema = json.loads(p.read_text(encoding="utf-8"))
+            schemas[schema.get("title", p.name.split(".")[0])] = schema
+        return schemas
+
+    return _cached(f"schemas-v{version}", files, build, use_cache)
+
+
+def load_api(openapi_path: Path = ROOT / "api/openapi.yaml", use_cache: bool = True) -> ApiSpec:
+    return _cached("openapi", [openapi_path], lambda: compile_api(load_yaml(openapi_path)), use_cache)